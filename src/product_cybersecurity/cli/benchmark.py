@@ -0,0 +1,418 @@
+import argparse
+import concurrent.futures
+import importlib
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+CVE_MODEL_MODULE = "product_cybersecurity.models.cve_model"
+CVE_CLI_MODULE = "product_cybersecurity.cli.cveviz_github"
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def measure_import_time(module: str, repeat: int) -> list[float]:
+    """
+    Imports module in fresh interpreters and returns the import times in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(module=module)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def worker_startup_probe(_) -> tuple[int, float, float]:
+    """
+    Runs in a pool worker: returns its pid, the time needed to import the CVE model and
+    the time needed to build its validator. Both are close to zero when inherited via fork.
+    """
+    start = time.perf_counter()
+    cve_model = importlib.import_module(CVE_MODEL_MODULE)
+    imported = time.perf_counter()
+    if not cve_model.CveJsonRecordFormat.__pydantic_complete__:
+        cve_model.CveJsonRecordFormat.model_rebuild()
+    return os.getpid(), imported - start, time.perf_counter() - imported
+
+
+def measure_worker_startup(start_method: str, workers: int) -> dict[int, tuple[float, float]]:
+    """
+    Starts a pool with the given start method and returns, for each worker pid,
+    its model import and validator build times.
+    """
+    context = multiprocessing.get_context(start_method)
+    startup: dict[int, tuple[float, float]] = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for pid, import_time, build_time in executor.map(worker_startup_probe, range(workers * 4)):
+            # A worker running several probes only pays the cost on the first one
+            startup.setdefault(pid, (import_time, build_time))
+    return startup
+
+
+def startup_benchmark(args) -> None:
+    print(f"Import time over {args.repeat} fresh interpreters (median / min):")
+    for module in (CVE_MODEL_MODULE, CVE_CLI_MODULE):
+        timings = measure_import_time(module, args.repeat)
+        print(f"  {module}: {statistics.median(timings):.3f}s / {min(timings):.3f}s")
+
+    # Preload in the parent, as cveviz_github does, before starting the pools
+    from product_cybersecurity.cli.cveviz_github import preload_cve_model
+    start = time.perf_counter()
+    preload_cve_model()
+    print(f"Validator build in the parent: {time.perf_counter() - start:.3f}s")
+
+    print(f"Worker startup with {args.workers} workers (mean import / mean build per worker):")
+    for start_method in multiprocessing.get_all_start_methods():
+        startup = measure_worker_startup(start_method, args.workers)
+        import_times = [t[0] for t in startup.values()]
+        build_times = [t[1] for t in startup.values()]
+        print(f"  {start_method}: {statistics.mean(import_times):.3f}s / {statistics.mean(build_times):.3f}s")
+
+
+def load_corpus(cve_dir: str, limit: Optional[int]) -> list[bytes]:
+    """
+    Reads the CVE files of cve_dir into memory, so that the benchmarks measure CPU work only.
+    """
+    from product_cybersecurity.cli.cveviz_github import collect_cve_files
+    file_args = collect_cve_files(cve_dir)[:limit]
+    corpus = []
+    for _, file_path in file_args:
+        with open(file_path, "rb") as f:
+            corpus.append(f.read())
+    return corpus
+
+
+def records_per_second(func: Callable[[bytes], Any], corpus: list[bytes], rounds: int) -> tuple[float, int]:
+    """
+    Runs func over the corpus rounds times in the current process and returns the throughput
+    along with the number of records func raised on.
+    """
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for data in corpus:
+            try:
+                func(data)
+            except Exception:
+                errors += 1
+    return len(corpus) * rounds / (time.perf_counter() - start), errors // rounds
+
+
+def validation_benchmark(args) -> None:
+    from product_cybersecurity.cli.cveviz_github import extract_cve_data_raw, preload_cve_model
+    from product_cybersecurity.models.cve_model import CveJsonRecordFormat
+    from product_cybersecurity.utils.jsonutils import available_json_backends, get_json_loads
+
+    corpus = load_corpus(args.cve_dir, args.limit)
+    if not corpus:
+        print(f"No CVE files found in {args.cve_dir}")
+        return
+    preload_cve_model()
+
+    paths: dict[str, Callable[[bytes], Any]] = {
+        "json.loads + model_validate": lambda data: CveJsonRecordFormat.model_validate(json.loads(data)),
+        "model_validate_json (bytes)": CveJsonRecordFormat.model_validate_json,
+    }
+    for backend in available_json_backends():
+        paths[f"decode only ({backend})"] = get_json_loads(backend)
+    for backend in available_json_backends():
+        loads = get_json_loads(backend)
+        paths[f"--fast projection ({backend})"] = lambda data, loads=loads: extract_cve_data_raw(loads(data))
+
+    print(f"{len(corpus)} records, {sum(len(d) for d in corpus) / 1e6:.1f} MB, {args.rounds} rounds, single core")
+    for name, func in paths.items():
+        throughput, errors = records_per_second(func, corpus, args.rounds)
+        print(f"  {name}: {throughput:,.0f} records/s/core" + (f" ({errors} failed records)" if errors else ""))
+
+
+# name -> (pattern, min_length, max_length) of the RootModel types of the generated CVE model the
+# constrained strings of cve_types replaced, copied verbatim from the datamodel-codegen output. Kept as
+# literals, independent of cve_types, so that the conformance check compares against the original regexes
+GENERATED_STRING_TYPES = {
+    "UuidType": (
+        r'^[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-4[0-9A-Fa-f]{3}-[89ABab][0-9A-Fa-f]{3}-[0-9A-Fa-f]{12}$',
+        None, None,
+    ),
+    "Cpe22and23": (
+        r'([c][pP][eE]:/[AHOaho]?(:[A-Za-z0-9._\-~%]*){0,6})|(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})',
+        1, 2048,
+    ),
+    "Cpe23": (
+        r'(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})',
+        1, 2048,
+    ),
+    "Timestamp": (
+        r'^(((2000|2400|2800|(19|2[0-9](0[48]|[2468][048]|[13579][26])))-02-29)|(((19|2[0-9])[0-9]{2})-02-(0[1-9]|1[0-9]|2[0-8]))|(((19|2[0-9])[0-9]{2})-(0[13578]|10|12)-(0[1-9]|[12][0-9]|3[01]))|(((19|2[0-9])[0-9]{2})-(0[469]|11)-(0[1-9]|[12][0-9]|30)))T(2[0-3]|[01][0-9]):([0-5][0-9]):([0-5][0-9])(\.[0-9]+)?(Z|[+-][0-9]{2}:[0-9]{2})?$',
+        None, None,
+    ),
+}
+
+# Keys under which the CVE record format stores values of the hot string types
+STRING_TYPE_KEYS = {
+    "UuidType": ("orgId", "assignerOrgId", "requesterUserId", "user", "matchCriteriaId"),
+    "Cpe22and23": ("cpes",),
+    "Cpe23": ("criteria",),
+    "Timestamp": ("dateReserved", "datePublished", "dateUpdated", "dateRejected", "dateAssigned", "datePublic", "time"),
+}
+
+
+def collect_string_values(node: Any, values: dict[str, list[str]]) -> None:
+    """
+    Walks a decoded CVE record and collects the values of the hot string types.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            for type_name, keys in STRING_TYPE_KEYS.items():
+                if key in keys:
+                    values[type_name].extend(v for v in (value if isinstance(value, list) else [value]) if isinstance(v, str))
+            collect_string_values(value, values)
+    elif isinstance(node, list):
+        for item in node:
+            collect_string_values(item, values)
+
+
+def mutate(value: str) -> list[str]:
+    """
+    Returns near-miss variants of a value, to exercise the rejecting side of the validators.
+    """
+    middle = len(value) // 2
+    return [value[:middle], value + "!", value[:middle] + "#" + value[middle + 1:], " " + value, value.upper(), ""]
+
+
+def string_types_benchmark(args) -> None:
+    from pydantic import RootModel, TypeAdapter, ValidationError, constr
+    from product_cybersecurity.models import cve_types
+
+    values: dict[str, list[str]] = {type_name: [] for type_name in STRING_TYPE_KEYS}
+    for data in load_corpus(args.cve_dir, args.limit):
+        collect_string_values(json.loads(data), values)
+
+    def accepts(adapter: TypeAdapter, value: str) -> bool:
+        try:
+            adapter.validate_python(value)
+            return True
+        except ValidationError:
+            return False
+
+    conformant = True
+    for type_name, (pattern, min_length, max_length) in GENERATED_STRING_TYPES.items():
+        # The RootModel the generated model used to declare for this type
+        schema_type = RootModel[constr(pattern=pattern, min_length=min_length, max_length=max_length)]
+        fast_type = getattr(cve_types, type_name)
+        schema_adapter = TypeAdapter(schema_type)
+        fast_adapter = TypeAdapter(fast_type)
+        corpus_values = values[type_name]
+        if not corpus_values:
+            print(f"{type_name}: no values found in the corpus")
+            continue
+
+        candidates = set(corpus_values)
+        for value in list(candidates):
+            candidates.update(mutate(value))
+        mismatches = [v for v in candidates if accepts(schema_adapter, v) != accepts(fast_adapter, v)]
+        conformant = conformant and not mismatches
+
+        timings = {}
+        for name, adapter in (("schema", TypeAdapter(list[schema_type])), ("fast", TypeAdapter(list[fast_type]))):
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                adapter.validate_python(corpus_values)
+            timings[name] = (time.perf_counter() - start) / (args.rounds * len(corpus_values))
+        print(f"{type_name}: {len(corpus_values)} values, {len(candidates)} checked, {len(mismatches)} mismatches, "
+              f"schema {timings['schema'] * 1e6:.2f}us/value, fast {timings['fast'] * 1e6:.2f}us/value "
+              f"({timings['schema'] / timings['fast']:.1f}x)")
+        for value in mismatches[:10]:
+            print(f"  mismatch: {value!r}")
+    print("Conformance OK" if conformant else "Conformance FAILED")
+
+
+# Extra cveviz_github arguments of every ingest mode
+INGEST_MODES = {
+    "strict": [],
+    "strict+prefetch": ["--io-threads", "4"],
+    "fast": ["--fast"],
+    "fast+prefetch": ["--fast", "--io-threads", "4"],
+}
+
+
+def run_ingest(cve_dir: str, mode_args: list[str], workers: Optional[int], work_dir: str) -> tuple[float, int, dict]:
+    """
+    Runs cveviz_github in a fresh interpreter and returns its wall time, the peak RSS in bytes of its
+    largest process (the parent or a worker) and its per-stage profile.
+    """
+    profile_path = os.path.join(work_dir, "profile.json")
+    command = [
+        sys.executable, "-m", CVE_CLI_MODULE, "--cve-dir", cve_dir,
+        "--output-dir", os.path.join(work_dir, "output"), "--profile", profile_path, *mode_args
+    ]
+    if workers:
+        command += ["--workers", str(workers)]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # wait4 gives the resource usage of this run only, RUSAGE_CHILDREN would accumulate over the modes
+    _, status, usage = os.wait4(process.pid, 0)
+    wall_time = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} exited with {process.returncode}")
+    with open(profile_path, encoding="utf-8") as f:
+        profile = json.load(f)
+    # ru_maxrss is in kilobytes on Linux
+    return wall_time, usage.ru_maxrss * 1024, profile
+
+
+def ingest_benchmark(args) -> None:
+    import polars as pl
+    from product_cybersecurity.cli.cveviz_github import collect_cve_files
+    from product_cybersecurity.cli.cvegen import generate_corpus
+
+    with tempfile.TemporaryDirectory(prefix="cve-ingest-") as work_dir:
+        cve_dir = args.cve_dir
+        if cve_dir is None:
+            cve_dir = os.path.join(work_dir, "corpus")
+            start = time.perf_counter()
+            written = generate_corpus(cve_dir, args.generate, args.seed, args.workers or os.cpu_count() or 1, invalid=args.invalid)
+            print(f"Generated {args.generate} records ({written / 1e6:.1f} MB, {args.invalid} invalid) in {time.perf_counter() - start:.2f}s")
+        records = len(collect_cve_files(cve_dir))
+
+        report = {"cve_dir": cve_dir, "records": records, "modes": {}}
+        for mode in args.modes:
+            wall_time, peak_rss, profile = run_ingest(cve_dir, INGEST_MODES[mode], args.workers, work_dir)
+            quarantined = pl.read_parquet(os.path.join(work_dir, "output", "cve_errors.parquet")).height
+            # Every mode has to quarantine exactly the records broken by the generator, and nothing else
+            if args.cve_dir is None and quarantined != args.invalid:
+                raise RuntimeError(f"{mode}: {quarantined} files quarantined, expected the {args.invalid} invalid records")
+            report["modes"][mode] = {"wall_time": wall_time, "records_per_second": records / wall_time, "peak_rss": peak_rss, "quarantined": quarantined, "stages": profile["stages"]}
+            print(f"{mode}: {records / wall_time:,.0f} records/s, {wall_time:.2f}s, peak RSS {peak_rss / 1e6:.0f} MB, {quarantined} quarantined")
+            for stage in profile["stages"]:
+                per_item = f", {stage['us_per_item']:.1f}us/item" if stage["us_per_item"] is not None else ""
+                print(f"  {stage['where']:>6} {stage['stage']:<15} {stage['seconds']:8.3f}s{per_item}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+
+def timed(func: Callable[[], Any], rounds: int) -> tuple[float, Any]:
+    """
+    Returns the best time of func over rounds calls, along with its last result.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def allocated(func: Callable[[], Any]) -> int:
+    """
+    Returns the bytes still allocated by the result of func, as seen by tracemalloc.
+    """
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def graph_benchmark(args) -> None:
+    import networkx as nx
+
+    from product_cybersecurity.models.capecparser import CapecCollection
+    from product_cybersecurity.models.cweparser import CweCollection
+    from product_cybersecurity.utils.csrgraph import security_csr_graph
+    from product_cybersecurity.utils.serializationutils import load_collection
+
+    cwe_collection = load_collection(CweCollection, args.cwe_json)
+    capec_collection = load_collection(CapecCollection, args.capec_json)
+    csr = security_csr_graph(cwe_collection, capec_collection)
+    graph = csr.to_networkx()
+    child_of = csr.relation("ChildOf")
+    child_of_graph = child_of.to_networkx()
+
+    def networkx_depths() -> dict:
+        depths: dict = {}
+        for node in reversed(list(nx.topological_sort(child_of_graph))):
+            depths[node] = max((depths[parent] + 1 for parent in child_of_graph.successors(node)), default=0)
+        return depths
+
+    def networkx_closure_sizes() -> list[int]:
+        return [len(nx.descendants(graph, node)) + 1 for node in graph]
+
+    print(f"{csr.node_count} nodes, {csr.edge_count} edges of {len(csr.natures)} natures, {args.rounds} rounds, best time")
+    operations = {
+        "build": (lambda: security_csr_graph(cwe_collection, capec_collection), csr.to_networkx),
+        "closure sizes, all natures": (csr.closure_sizes, networkx_closure_sizes),
+        "ChildOf depths": (child_of.depths, networkx_depths),
+        "in and out degrees": (lambda: (csr.in_degree(), csr.out_degree()), lambda: (dict(graph.in_degree()), dict(graph.out_degree()))),
+    }
+    for name, (csr_func, networkx_func) in operations.items():
+        csr_time, _ = timed(csr_func, args.rounds)
+        networkx_time, _ = timed(networkx_func, args.rounds)
+        print(f"  {name}: CSR {csr_time * 1e3:.2f}ms, networkx {networkx_time * 1e3:.2f}ms ({networkx_time / csr_time:.1f}x)")
+    print(f"  memory: CSR {allocated(lambda: security_csr_graph(cwe_collection, capec_collection)) / 1e6:.2f} MB, networkx {allocated(csr.to_networkx) / 1e6:.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the CVE extraction pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    startup_parser = subparsers.add_parser("startup", help="Report CVE model import time for the CLI and the pool workers.")
+    startup_parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters used to time the imports.")
+    startup_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of pool workers.")
+    startup_parser.set_defaults(func=startup_benchmark)
+
+    validate_parser = subparsers.add_parser("validate", help="Report records per second per core for each CVE decode/validation path.")
+    validate_parser.add_argument("--cve-dir", required=True, help="Directory containing the CVE JSON files, organised in year subdirectories.")
+    validate_parser.add_argument("--limit", type=int, help="Only use the first N files.")
+    validate_parser.add_argument("--rounds", type=int, default=3, help="Number of passes over the records.")
+    validate_parser.set_defaults(func=validation_benchmark)
+
+    types_parser = subparsers.add_parser("types", help="Check the CPE, timestamp and UUID types against the schema regexes on a corpus and time them.")
+    types_parser.add_argument("--cve-dir", required=True, help="Directory containing the CVE JSON files, organised in year subdirectories.")
+    types_parser.add_argument("--limit", type=int, help="Only use the first N files.")
+    types_parser.add_argument("--rounds", type=int, default=20, help="Number of validation passes used for the timings.")
+    types_parser.set_defaults(func=string_types_benchmark)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Run cveviz_github end to end in each ingest mode and report records/s, peak RSS and per-stage timings.")
+    corpus_group = ingest_parser.add_mutually_exclusive_group(required=True)
+    corpus_group.add_argument("--cve-dir", help="Directory containing the CVE JSON files, organised in year subdirectories.")
+    corpus_group.add_argument("--generate", type=int, help="Generate a synthetic corpus of N records in a temporary directory instead.")
+    ingest_parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpus.")
+    ingest_parser.add_argument("--invalid", type=int, default=0, help="Break the first N records of the synthetic corpus and check that every mode quarantines them.")
+    ingest_parser.add_argument("--modes", nargs="+", choices=list(INGEST_MODES), default=list(INGEST_MODES), help="Ingest modes to run, all by default.")
+    ingest_parser.add_argument("--workers", type=int, help="Number of worker processes. Defaults to the number of CPUs.")
+    ingest_parser.add_argument("--report", help="Also write the results to this JSON file.")
+    ingest_parser.set_defaults(func=ingest_benchmark)
+
+    graph_parser = subparsers.add_parser("graph", help="Compare the CSR graph of the CWE and CAPEC relations with networkx on bulk analytics.")
+    graph_parser.add_argument("--capec-json", required=True, help="Path to CAPEC JSON file.")
+    graph_parser.add_argument("--cwe-json", required=True, help="Path to CWE JSON file.")
+    graph_parser.add_argument("--rounds", type=int, default=5, help="Number of runs of every operation.")
+    graph_parser.set_defaults(func=graph_benchmark)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+# Assigners and their share of the records, roughly following the CVE list
+ASSIGNERS = [
+    ("mitre", 0.25), ("GitHub_M", 0.10), ("Linux", 0.10), ("VulDB", 0.08), ("wordfence", 0.08),
+    ("redhat", 0.05), ("microsoft", 0.05), ("WPScan", 0.04), ("patchstack", 0.10),
+    ("apache", 0.03), ("cisco", 0.04), ("oracle", 0.04), ("google_android", 0.04),
+]
+ADP_PROVIDERS = {
+    "CISA-ADP": "134c704f-9b21-4f2e-91b3-4a467353bcc0",
+    "CVE": "af854a3a-2127-422b-91ae-364da2661108",
+}
+CWES = [
+    ("CWE-79", "Improper Neutralization of Input During Web Page Generation ('Cross-site Scripting')"),
+    ("CWE-787", "Out-of-bounds Write"),
+    ("CWE-89", "Improper Neutralization of Special Elements used in an SQL Command ('SQL Injection')"),
+    ("CWE-352", "Cross-Site Request Forgery (CSRF)"),
+    ("CWE-22", "Improper Limitation of a Pathname to a Restricted Directory ('Path Traversal')"),
+    ("CWE-125", "Out-of-bounds Read"),
+    ("CWE-78", "Improper Neutralization of Special Elements used in an OS Command ('OS Command Injection')"),
+    ("CWE-416", "Use After Free"),
+    ("CWE-862", "Missing Authorization"),
+    ("CWE-434", "Unrestricted Upload of File with Dangerous Type"),
+    ("CWE-94", "Improper Control of Generation of Code ('Code Injection')"),
+    ("CWE-20", "Improper Input Validation"),
+    ("CWE-77", "Improper Neutralization of Special Elements used in a Command ('Command Injection')"),
+    ("CWE-287", "Improper Authentication"),
+    ("CWE-269", "Improper Privilege Management"),
+    ("CWE-502", "Deserialization of Untrusted Data"),
+    ("CWE-200", "Exposure of Sensitive Information to an Unauthorized Actor"),
+    ("CWE-863", "Incorrect Authorization"),
+    ("CWE-918", "Server-Side Request Forgery (SSRF)"),
+    ("CWE-119", "Improper Restriction of Operations within the Bounds of a Memory Buffer"),
+    ("CWE-476", "NULL Pointer Dereference"),
+    ("CWE-798", "Use of Hard-coded Credentials"),
+    ("CWE-190", "Integer Overflow or Wraparound"),
+    ("CWE-400", "Uncontrolled Resource Consumption"),
+    ("CWE-306", "Missing Authentication for Critical Function"),
+]
+WORDS = (
+    "allows remote attackers to execute arbitrary code via a crafted request in the component "
+    "which leads to memory corruption when parsing untrusted input authenticated users can "
+    "bypass access restrictions and read sensitive files through the vulnerable endpoint"
+).split()
+REFERENCE_TAGS = ["vendor-advisory", "patch", "exploit", "third-party-advisory", "issue-tracking", "x_refsource_MISC"]
+FIRST_YEAR = 1999
+LAST_YEAR = 2025
+# Ways the invalid records of a corpus are broken, in turn: a file that is not valid JSON, a state
+# outside the schema and a date that is not a timestamp, the latter two not validated by --fast
+INVALID_KINDS = ("json", "state", "date")
+
+
+def severity(score: float) -> str:
+    if score == 0:
+        return "NONE"
+    if score < 4:
+        return "LOW"
+    if score < 7:
+        return "MEDIUM"
+    if score < 9:
+        return "HIGH"
+    return "CRITICAL"
+
+
+def random_score(rng: random.Random) -> float:
+    return round(min(10.0, max(0.1, rng.gauss(6.8, 1.8))), 1)
+
+
+def cvss_v2(rng: random.Random) -> Dict[str, Any]:
+    vector = "/".join([
+        f"AV:{rng.choice('NAL')}", f"AC:{rng.choice('LMH')}", f"Au:{rng.choice('MSN')}",
+        f"C:{rng.choice('NPC')}", f"I:{rng.choice('NPC')}", f"A:{rng.choice('NPC')}",
+    ])
+    return {"version": "2.0", "vectorString": vector, "baseScore": random_score(rng)}
+
+
+def cvss_v3(rng: random.Random, version: str) -> Dict[str, Any]:
+    values = {
+        "attackVector": rng.choice(["NETWORK", "ADJACENT_NETWORK", "LOCAL", "PHYSICAL"]),
+        "attackComplexity": rng.choice(["LOW", "HIGH"]),
+        "privilegesRequired": rng.choice(["NONE", "LOW", "HIGH"]),
+        "userInteraction": rng.choice(["NONE", "REQUIRED"]),
+        "scope": rng.choice(["UNCHANGED", "CHANGED"]),
+        "confidentialityImpact": rng.choice(["NONE", "LOW", "HIGH"]),
+        "integrityImpact": rng.choice(["NONE", "LOW", "HIGH"]),
+        "availabilityImpact": rng.choice(["NONE", "LOW", "HIGH"]),
+    }
+    vector = "/".join([
+        f"CVSS:{version}", f"AV:{values['attackVector'][0]}", f"AC:{values['attackComplexity'][0]}",
+        f"PR:{values['privilegesRequired'][0]}", f"UI:{values['userInteraction'][0]}", f"S:{values['scope'][0]}",
+        f"C:{values['confidentialityImpact'][0]}", f"I:{values['integrityImpact'][0]}", f"A:{values['availabilityImpact'][0]}",
+    ])
+    score = random_score(rng)
+    return {"version": version, "vectorString": vector, "baseScore": score, "baseSeverity": severity(score), **values}
+
+
+def cvss_v4(rng: random.Random) -> Dict[str, Any]:
+    vector = "/".join([
+        "CVSS:4.0", f"AV:{rng.choice('NALP')}", f"AC:{rng.choice('LH')}", f"AT:{rng.choice('NP')}",
+        f"PR:{rng.choice('NLH')}", f"UI:{rng.choice('NPA')}",
+        f"VC:{rng.choice('HLN')}", f"VI:{rng.choice('HLN')}", f"VA:{rng.choice('HLN')}",
+        f"SC:{rng.choice('HLN')}", f"SI:{rng.choice('HLN')}", f"SA:{rng.choice('HLN')}",
+    ])
+    score = random_score(rng)
+    return {"version": "4.0", "vectorString": vector, "baseScore": score, "baseSeverity": severity(score)}
+
+
+def cna_metrics(rng: random.Random, year: int) -> List[Dict[str, Any]]:
+    """
+    Picks the CVSS versions a CNA of that year would typically provide.
+    """
+    metrics = []
+    if year < 2016 and rng.random() < 0.6:
+        metrics.append({"cvssV2_0": cvss_v2(rng)})
+    if 2016 <= year < 2020 and rng.random() < 0.5:
+        metrics.append({"cvssV3_0": cvss_v3(rng, "3.0")})
+    if year >= 2019 and rng.random() < 0.7:
+        metrics.append({"format": "CVSS", "scenarios": [{"lang": "en", "value": "GENERAL"}], "cvssV3_1": cvss_v3(rng, "3.1")})
+    if year >= 2023 and rng.random() < 0.3:
+        metrics.append({"cvssV4_0": cvss_v4(rng)})
+    return metrics
+
+
+def timestamp(rng: random.Random, year: int, days_after: int = 0) -> str:
+    date = datetime(year, 1, 1) + timedelta(days=days_after, seconds=rng.randrange(365 * 24 * 3600))
+    return date.strftime("%Y-%m-%dT%H:%M:%S") + f".{rng.randrange(1000):03d}Z"
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def affected_products(rng: random.Random, vendor: str) -> List[Dict[str, Any]]:
+    """
+    Affected products with a long tailed number of versions: most records list a few versions,
+    a few (e.g. kernel or library CVEs) list hundreds.
+    """
+    products = []
+    for p in range(1 if rng.random() < 0.8 else rng.randint(2, 12)):
+        product = f"{vendor}_product_{rng.randrange(500)}"
+        n_versions = min(2000, int(rng.lognormvariate(0.7, 1.3)) + 1)
+        versions = []
+        for v in range(n_versions):
+            entry = {"version": f"{rng.randint(0, 20)}.{v}.{rng.randint(0, 99)}", "status": "affected"}
+            if rng.random() < 0.4:
+                entry["lessThan"] = f"{rng.randint(0, 20)}.{v + 1}"
+                entry["versionType"] = rng.choice(["semver", "custom", "git", "rpm"])
+            versions.append(entry)
+        products.append({
+            "vendor": vendor,
+            "product": product,
+            "cpes": [f"cpe:2.3:a:{vendor.lower()}:{product.lower()}:*:*:*:*:*:*:*:*"],
+            "versions": versions,
+            "defaultStatus": rng.choice(["unaffected", "unknown", "affected"]),
+        })
+    return products
+
+
+def problem_types(rng: random.Random) -> List[Dict[str, Any]]:
+    descriptions = []
+    for cwe_id, name in rng.sample(CWES, 1 if rng.random() < 0.9 else rng.randint(2, 3)):
+        descriptions.append({"lang": "en", "description": f"{cwe_id} {name}", "cweId": cwe_id, "type": "CWE"})
+    return [{"descriptions": descriptions}]
+
+
+def references(rng: random.Random, vendor: str) -> List[Dict[str, Any]]:
+    refs = []
+    for r in range(min(200, int(rng.lognormvariate(1.2, 0.9)) + 1)):
+        ref: Dict[str, Any] = {"url": f"https://{vendor.lower()}.example.com/advisories/{rng.randrange(10 ** 6)}/{r}"}
+        if rng.random() < 0.6:
+            ref["tags"] = rng.sample(REFERENCE_TAGS, rng.randint(1, 2))
+        refs.append(ref)
+    return refs
+
+
+def adp_containers(rng: random.Random, cve_id: str, year: int, vendor: str) -> List[Dict[str, Any]]:
+    """
+    Recent records mostly carry the CISA vulnrichment container, some also the CVE program one.
+    """
+    containers = []
+    if year >= 2020 and rng.random() < 0.6:
+        metrics: List[Dict[str, Any]] = [{"other": {"type": "ssvc", "content": {
+            "id": cve_id, "role": "CISA Coordinator", "version": "2.0.3", "timestamp": timestamp(rng, year, 30),
+            "options": [{"Exploitation": rng.choice(["none", "poc", "active"])}, {"Automatable": rng.choice(["no", "yes"])},
+                        {"Technical Impact": rng.choice(["partial", "total"])}],
+        }}}]
+        container: Dict[str, Any] = {
+            "providerMetadata": {"orgId": ADP_PROVIDERS["CISA-ADP"], "shortName": "CISA-ADP", "dateUpdated": timestamp(rng, year, 60)},
+            "title": "CISA ADP Vulnrichment",
+            "metrics": metrics,
+        }
+        if rng.random() < 0.4:
+            metrics.insert(0, {"cvssV3_1": cvss_v3(rng, "3.1")})
+            container["problemTypes"] = problem_types(rng)
+            container["affected"] = affected_products(rng, vendor)
+        containers.append(container)
+    if rng.random() < 0.3:
+        containers.append({
+            "providerMetadata": {"orgId": ADP_PROVIDERS["CVE"], "shortName": "CVE", "dateUpdated": timestamp(rng, year, 90)},
+            "title": "CVE Program Container",
+            "references": [dict(ref, tags=["x_transferred"]) for ref in references(rng, vendor)],
+        })
+    return containers
+
+
+def generate_record(seed: int, index: int) -> Tuple[int, str, Dict[str, Any]]:
+    """
+    Generates the record number index of a corpus; the same seed and index always give the same record.
+    Returns its year, cveId and JSON object.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    # More recent years hold more records
+    year = min(LAST_YEAR, FIRST_YEAR + int((LAST_YEAR - FIRST_YEAR + 1) * rng.random() ** 0.5))
+    cve_id = f"CVE-{year}-{1000 + index}"
+    assigner = rng.choices([name for name, _ in ASSIGNERS], weights=[weight for _, weight in ASSIGNERS])[0]
+    assigner_org_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    vendor = f"Vendor{rng.randrange(5000)}"
+    metadata: Dict[str, Any] = {
+        "cveId": cve_id,
+        "assignerOrgId": assigner_org_id,
+        "assignerShortName": assigner,
+        "dateReserved": timestamp(rng, year),
+        "dateUpdated": timestamp(rng, year, 120),
+    }
+    provider = {"orgId": assigner_org_id, "shortName": assigner, "dateUpdated": timestamp(rng, year, 10)}
+
+    if rng.random() < 0.05:
+        metadata["state"] = "REJECTED"
+        metadata["dateRejected"] = timestamp(rng, year, 20)
+        containers: Dict[str, Any] = {"cna": {
+            "providerMetadata": provider,
+            "rejectedReasons": [{"lang": "en", "value": "** REJECT ** DO NOT USE THIS CANDIDATE NUMBER. " + sentence(rng, 12)}],
+        }}
+    else:
+        metadata["state"] = "PUBLISHED"
+        metadata["datePublished"] = timestamp(rng, year, 15)
+        cna: Dict[str, Any] = {
+            "providerMetadata": provider,
+            "title": sentence(rng, rng.randint(4, 12))[:256],
+            "descriptions": [{"lang": "en", "value": sentence(rng, int(rng.lognormvariate(3.5, 0.6)) + 5)}],
+            "affected": affected_products(rng, vendor),
+            "problemTypes": problem_types(rng),
+            "references": references(rng, vendor),
+        }
+        metrics = cna_metrics(rng, year)
+        if metrics:
+            cna["metrics"] = metrics
+        containers = {"cna": cna}
+        adp = adp_containers(rng, cve_id, year, vendor)
+        if adp:
+            containers["adp"] = adp
+
+    record = {"dataType": "CVE_RECORD", "dataVersion": "5.1", "cveMetadata": metadata, "containers": containers}
+    return year, cve_id, record
+
+
+def write_records(output_dir: str, seed: int, start: int, stop: int, invalid: int = 0) -> int:
+    """
+    Writes records start to stop - 1 to output_dir/<year>/<cveId>.json and returns the bytes written.
+    The records numbered below invalid are broken in one of the INVALID_KINDS ways.
+    """
+    written = 0
+    for index in range(start, stop):
+        year, cve_id, record = generate_record(seed, index)
+        kind = INVALID_KINDS[index % len(INVALID_KINDS)] if index < invalid else None
+        if kind == "state":
+            record["cveMetadata"]["state"] = "BOGUS"
+        elif kind == "date":
+            record["cveMetadata"]["dateReserved"] = "not-a-date"
+        data = json.dumps(record, indent=2).encode("utf-8")
+        if kind == "json":
+            data = data[:len(data) // 2]
+        with open(os.path.join(output_dir, str(year), f"{cve_id}.json"), "wb") as f:
+            f.write(data)
+        written += len(data)
+    return written
+
+
+def generate_corpus(output_dir: str, count: int, seed: int = 0, workers: int = 1, chunk_size: int = 1000, invalid: int = 0) -> int:
+    """
+    Generates a corpus of count records laid out like data/github_cve, in a process pool, the first
+    invalid records of which are broken. Returns the number of bytes written.
+    """
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        os.makedirs(os.path.join(output_dir, str(year)), exist_ok=True)
+    chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(write_records, output_dir, seed, start, stop, invalid) for start, stop in chunks]
+        return sum(future.result() for future in concurrent.futures.as_completed(futures))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of CVE 5.x JSON records for benchmarks and tests.")
+    parser.add_argument("--output-dir", required=True, help="Directory to write the year subdirectories of CVE files to.")
+    parser.add_argument("--count", type=int, default=10000, help="Number of records to generate. Defaults to 10000.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus, the same seed always gives the same records. Defaults to 0.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of generator processes. Defaults to the number of CPUs.")
+    parser.add_argument("--invalid", type=int, default=0, help="Number of records broken on purpose: bad JSON, an unknown state or a bad date in turn. Defaults to 0.")
+    args = parser.parse_args()
+
+    start = time.time()
+    written = generate_corpus(args.output_dir, args.count, args.seed, args.workers, invalid=args.invalid)
+    print(f"Generated {args.count} records ({written / 1e6:.1f} MB, {args.invalid} invalid) in {args.output_dir} in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
 import argparse
+import functools
 import os
-import json
-from pydantic import BaseModel
+import random
+import re
+import time
+from pydantic import BaseModel, ValidationError
 import polars as pl
-from typing import List, Optional, NamedTuple
+import pydantic_core
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, NamedTuple, Tuple, Union
 import concurrent.futures
+import multiprocessing
 from tqdm import tqdm
 
 from product_cybersecurity.models.cve_model import CnaPublishedContainer, CveJsonRecordFormat, NoneScoreType, Containers
+from product_cybersecurity.models.cve_types import TIMESTAMP_PATTERN
+from product_cybersecurity.models.deferred import build_deferred_model
+from product_cybersecurity.utils.jsonutils import JSON_BACKENDS, get_json_loads
+from product_cybersecurity.utils.profiling import StageTimings, print_profile, worker_cprofile, write_profile_report
 
 class CveData(BaseModel):
     id : str
@@ -29,6 +39,64 @@ class CveCweData(BaseModel):
     cve_id: str
     cwe: str
 
+# Types of the output columns, the workers extract strings and the writer converts them
+# (see "CVE output tables" in the README)
+CVE_STATES = ("PUBLISHED", "REJECTED")
+CVE_STATE_TYPE = pl.Enum(list(CVE_STATES))
+CVE_TIMESTAMP = re.compile(TIMESTAMP_PATTERN)
+
+def parse_cve_timestamp(column: str) -> pl.Expr:
+    """
+    Parses a column of CVE record timestamps into UTC datetimes.
+    The schema allows timestamps without an offset, they are taken as UTC.
+    """
+    value = pl.col(column).cast(pl.String).str.replace(r"Z$", "+00:00")
+    value = pl.when(value.str.contains(r"[+-][0-9]{2}:[0-9]{2}$")).then(value).otherwise(value + "+00:00")
+    return value.str.to_datetime("%Y-%m-%dT%H:%M:%S%.f%:z", time_unit="us", time_zone="UTC").alias(column)
+
+def type_cve_columns(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Converts the CveData string columns to their output types: UTC datetimes for the dates, an enum
+    for the state, a categorical for the assigner, and the CVE id split into cve_year and cve_number.
+    Already typed tables are left as they are, so older outputs can be converted too.
+    """
+    if not df.columns:
+        return df
+    id_parts = pl.col("id").str.extract_groups(r"^CVE-([0-9]{4})-([0-9]+)$")
+    df = df.with_columns(
+        id_parts.struct.field("1").cast(pl.Int16).alias("cve_year"),
+        id_parts.struct.field("2").cast(pl.Int32).alias("cve_number"),
+        pl.col("assigner").cast(pl.String).cast(pl.Categorical),
+        pl.col("state").cast(pl.String).cast(CVE_STATE_TYPE),
+        *(parse_cve_timestamp(column) for column in ("date_reserved", "date_published") if not isinstance(df.schema[column], pl.Datetime)),
+    )
+    return df.select("id", "cve_year", "cve_number", pl.exclude("id", "cve_year", "cve_number"))
+
+def type_cve_cwe_columns(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Converts the cwe column of the CVE-CWE pairs to a categorical.
+    """
+    return df.with_columns(pl.col("cwe").cast(pl.String).cast(pl.Categorical))
+
+# Quarantined CVE file that could not be read, decoded, validated or extracted
+class CveFailure(BaseModel):
+    path: str
+    year: int
+    cve_id: Optional[str]
+    error_type: str
+    error_locs: List[str]
+    message: str
+
+# Schema of the error table, so that an empty table can still be written
+CVE_FAILURE_SCHEMA = {
+    "path": pl.String,
+    "year": pl.Int64,
+    "cve_id": pl.String,
+    "error_type": pl.String,
+    "error_locs": pl.List(pl.String),
+    "message": pl.String,
+}
+
 
 class ExtractedCveData(NamedTuple):
     cve_data: CveData
@@ -46,8 +114,8 @@ def extract_cve_data(cve: CveJsonRecordFormat) -> ExtractedCveData:
     adp_cvss_v3 = None
     adp_cvss_v3_1 = None
     adp_cvss_v4 = None
-    date_reserved = cve.root.cveMetadata.dateReserved.root if cve.root.cveMetadata.dateReserved else None
-    date_published = cve.root.cveMetadata.datePublished.root if cve.root.cveMetadata.datePublished else None
+    date_reserved = cve.root.cveMetadata.dateReserved
+    date_published = cve.root.cveMetadata.datePublished
 
     cwe_list: List[str] = []
     # Extract CWEs from CNA container if present
@@ -109,16 +177,402 @@ def extract_cve_data(cve: CveJsonRecordFormat) -> ExtractedCveData:
     )
     return ExtractedCveData(cve_data=cve_data, cwe_list=cwe_list)
 
-def process_cve_file(args) -> Optional[ExtractedCveData]:
+# Stage timings of the current worker process, sent back to the parent with every batch
+WORKER_TIMINGS = StageTimings("worker")
+
+def read_cve_file(file_path: str, data: Optional[bytes] = None) -> bytes:
+    """
+    Returns the bytes of a CVE file, unless they were already prefetched by the parent.
+    """
+    if data is None:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    return data
+
+def quarantine_cve_file(args, data: Optional[bytes], error: Exception) -> CveFailure:
+    """
+    Describes a failed CVE file: the cveId is recovered from the raw JSON when it can be decoded,
+    and for validation errors the location of every Pydantic error is kept.
+    """
+    year, file_path = args
+    cve_id = None
+    if data is not None:
+        try:
+            cve_id = str(pydantic_core.from_json(data)["cveMetadata"]["cveId"])
+        except Exception:
+            pass
+    error_locs = []
+    if isinstance(error, ValidationError):
+        # Errors of the whole document, such as invalid JSON, have no location
+        error_locs = [".".join(str(part) for part in e["loc"]) for e in error.errors() if e["loc"]]
+    return CveFailure(path=file_path, year=year, cve_id=cve_id, error_type=type(error).__name__, error_locs=error_locs, message=str(error))
+
+def process_cve_file(args, data: Optional[bytes] = None) -> Union[ExtractedCveData, CveFailure]:
+    year, file_path = args
+    try:
+        if data is None:
+            with WORKER_TIMINGS.stage("read"):
+                data = read_cve_file(file_path)
+        # Validate straight from the raw bytes, pydantic-core parses the JSON while validating
+        with WORKER_TIMINGS.stage("decode+validate"):
+            cve_model = CveJsonRecordFormat.model_validate_json(data)
+        with WORKER_TIMINGS.stage("extract"):
+            return extract_cve_data(cve_model)
+    except Exception as e:
+        return quarantine_cve_file(args, data, e)
+
+def check_cve_metadata(metadata: Dict[str, Any]) -> None:
+    """
+    Checks the state and dates of a record that was not validated, as the writer converts them strictly:
+    a bad record raises ValueError and is quarantined instead of failing the whole table.
+    """
+    if metadata["state"] not in CVE_STATES:
+        raise ValueError(f"cveMetadata.state: {metadata['state']!r} is not one of {', '.join(CVE_STATES)}")
+    for field in ("dateReserved", "datePublished"):
+        value = metadata.get(field)
+        if value is not None and not (isinstance(value, str) and CVE_TIMESTAMP.fullmatch(value)):
+            raise ValueError(f"cveMetadata.{field}: {value!r} is not a timestamp")
+
+def extract_cve_data_raw(record: Dict[str, Any]) -> ExtractedCveData:
+    """
+    Extracts the same fields as extract_cve_data by walking the decoded JSON directly,
+    without validating the record against CveJsonRecordFormat. Only the state and dates are checked.
+    """
+    metadata = record["cveMetadata"]
+    check_cve_metadata(metadata)
+    containers = record["containers"]
+    # Only published records carry a CnaPublishedContainer and ADP containers
+    published = metadata["state"] == "PUBLISHED"
+    cna_scores: Dict[str, Optional[float]] = {"cvssV2_0": None, "cvssV3_0": None, "cvssV3_1": None, "cvssV4_0": None}
+    adp_scores: Dict[str, Optional[float]] = {"cvssV2_0": None, "cvssV3_0": None, "cvssV3_1": None, "cvssV4_0": None}
+    cwe_list: List[str] = []
+
+    containers_list = [(containers["cna"], cna_scores)] if published else []
+    if published:
+        containers_list += [(adp, adp_scores) for adp in containers.get("adp") or []]
+    for container, scores in containers_list:
+        for met in container.get("metrics") or []:
+            for version in ("cvssV2_0", "cvssV3_0", "cvssV3_1", "cvssV4_0"):
+                cvss = met.get(version)
+                if not cvss:
+                    continue
+                base_score = cvss.get("baseScore")
+                # A 0.0 CVSS 3.x score validates as NoneScoreType, which the strict extraction skips
+                if version in ("cvssV3_0", "cvssV3_1") and base_score == 0:
+                    continue
+                scores[version] = base_score
+        for pt in container.get("problemTypes") or []:
+            for desc in pt.get("descriptions") or []:
+                if desc.get("cweId"):
+                    cwe_list.append(desc["cweId"])
+
+    cve_data = CveData(
+        id=metadata["cveId"],
+        assigner=str(metadata.get("assignerShortName")),
+        state=metadata["state"],
+        cvss_v2=cna_scores["cvssV2_0"],
+        cvss_v3=cna_scores["cvssV3_0"],
+        cvss_v3_1=cna_scores["cvssV3_1"],
+        cvss_v4=cna_scores["cvssV4_0"],
+        adp_cvss_v2=adp_scores["cvssV2_0"],
+        adp_cvss_v3=adp_scores["cvssV3_0"],
+        adp_cvss_v3_1=adp_scores["cvssV3_1"],
+        adp_cvss_v4=adp_scores["cvssV4_0"],
+        date_reserved=metadata.get("dateReserved"),
+        date_published=metadata.get("datePublished")
+    )
+    return ExtractedCveData(cve_data=cve_data, cwe_list=cwe_list)
+
+class FastExtractedCveData(NamedTuple):
+    extracted: Optional[ExtractedCveData]
+    sampled: bool
+    divergence: Optional[str]
+    failure: Optional[CveFailure] = None
+
+def is_sampled(file_path: str, sample_rate: float, seed: int) -> bool:
+    """
+    Deterministically decides whether a file belongs to the validation sample,
+    independently of which worker processes it.
+    """
+    return random.Random(f"{seed}:{file_path}").random() < sample_rate
+
+def compare_extractions(strict: ExtractedCveData, fast: ExtractedCveData) -> Optional[str]:
+    """
+    Returns a description of the differences between both extractions, or None when they match.
+    """
+    differences = []
+    strict_fields = strict.cve_data.model_dump()
+    fast_fields = fast.cve_data.model_dump()
+    for field, value in strict_fields.items():
+        if fast_fields[field] != value:
+            differences.append(f"{field}: strict={value!r} fast={fast_fields[field]!r}")
+    if strict.cwe_list != fast.cwe_list:
+        differences.append(f"cwe_list: strict={strict.cwe_list!r} fast={fast.cwe_list!r}")
+    return "; ".join(differences) or None
+
+def process_cve_file_fast(args, data: Optional[bytes] = None, json_backend: str = "pydantic-core", sample_rate: float = 0.0, seed: int = 0) -> FastExtractedCveData:
+    """
+    Projection mode: decodes the file without validation and extracts the columns from the raw dict.
+    Files in the validation sample are also validated and extracted strictly; the strict result is
+    kept and any difference with the fast one is reported as a divergence.
+    Files failing to decode, or failing the strict validation when sampled, are quarantined.
+    """
     year, file_path = args
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            cve_data = json.load(f)
-        cve_model = CveJsonRecordFormat.model_validate(cve_data)
-        return extract_cve_data(cve_model)
+        if data is None:
+            with WORKER_TIMINGS.stage("read"):
+                data = read_cve_file(file_path)
+        with WORKER_TIMINGS.stage("decode"):
+            record = get_json_loads(json_backend)(data)
+        with WORKER_TIMINGS.stage("extract"):
+            fast = extract_cve_data_raw(record)
+    except Exception as e:
+        return FastExtractedCveData(extracted=None, sampled=False, divergence=None, failure=quarantine_cve_file(args, data, e))
+
+    if not is_sampled(file_path, sample_rate, seed):
+        return FastExtractedCveData(extracted=fast, sampled=False, divergence=None)
+    try:
+        with WORKER_TIMINGS.stage("decode+validate"):
+            cve_model = CveJsonRecordFormat.model_validate_json(data)
+        strict = extract_cve_data(cve_model)
     except Exception as e:
-        print(f"Error processing {file_path}: {e}")
-        return None
+        return FastExtractedCveData(
+            extracted=None, sampled=True, divergence=f"{file_path}: strict validation failed: {e}",
+            failure=quarantine_cve_file(args, data, e)
+        )
+    divergence = compare_extractions(strict, fast)
+    return FastExtractedCveData(extracted=strict, sampled=True, divergence=f"{file_path}: {divergence}" if divergence else None)
+
+def collect_cve_files(cve_dir: str) -> List[Tuple[int, str]]:
+    """
+    Returns the (year, file_path) pairs of every CVE JSON file found in the year
+    subdirectories of cve_dir, sorted by year and filename.
+    """
+    # Collect subdirectories (years), sort, and process in order
+    year_dirs = []
+    for entry in os.scandir(cve_dir):
+        if entry.is_dir():
+            try:
+                year = int(entry.name)
+                year_dirs.append((year, entry.path))
+            except ValueError:
+                continue  # Skip non-year directories
+
+    # Gather all (year, file_path) pairs
+    file_args = []
+    for year, root in sorted(year_dirs):
+        for filename in sorted(os.listdir(root)):
+            if filename.endswith(".json"):
+                file_path = os.path.join(root, filename)
+                file_args.append((year, file_path))
+    return file_args
+
+def file_size(file_path: str) -> int:
+    """
+    Returns the size of a file, 0 when it cannot be stat-ed so that the worker reports the error itself.
+    """
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+def schedule_by_size(file_args: List[Tuple[int, str]], n_batches: int) -> List[List[Tuple[int, Tuple[int, str]]]]:
+    """
+    Stats every file and groups them into batches of roughly equal total size, largest files first.
+    Large, ADP-heavy records end up in small early batches and the tail of the run is made of
+    batches of small files, so workers finish at about the same time.
+    Each batch item is (index in file_args, (year, file_path)).
+    """
+    sized = sorted(
+        ((file_size(file_path), index, (year, file_path)) for index, (year, file_path) in enumerate(file_args)),
+        key=lambda item: item[0],
+        reverse=True
+    )
+    target_size = sum(size for size, _, _ in sized) / max(n_batches, 1)
+
+    batches = []
+    batch: List[Tuple[int, Tuple[int, str]]] = []
+    batch_size = 0
+    for size, index, file_arg in sized:
+        batch.append((index, file_arg))
+        batch_size += size
+        if batch_size >= target_size:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+def read_batch(batch: List[Tuple[int, Tuple[int, str]]], timings: Optional[StageTimings] = None) -> List[Tuple[int, Tuple[int, str], Optional[bytes]]]:
+    """
+    Reads the files of a batch, returning its items with their bytes attached.
+    Unreadable files get None so that the worker reports the error itself.
+    """
+    items = []
+    start = time.perf_counter()
+    for index, (year, file_path) in batch:
+        try:
+            data = read_cve_file(file_path)
+        except OSError:
+            data = None
+        items.append((index, (year, file_path), data))
+    if timings is not None:
+        timings.add("read", time.perf_counter() - start, len(batch))
+    return items
+
+def prefetch_batches(batches: List[List[Tuple[int, Tuple[int, str]]]], io_threads: int, max_prefetched: int, timings: Optional[StageTimings] = None) -> Iterator[List[Tuple[int, Tuple[int, str], Optional[bytes]]]]:
+    """
+    Reads the batches in a pool of I/O threads and yields them, in order, as soon as they are loaded.
+    At most max_prefetched batches are read ahead, which bounds the memory held by the buffers.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=io_threads) as readers:
+        pending: Deque[concurrent.futures.Future] = deque()
+        for batch in batches:
+            pending.append(readers.submit(read_batch, batch, timings))
+            if len(pending) >= max_prefetched:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+class BatchResult(NamedTuple):
+    results: List[Tuple[int, Any]]
+    pid: int
+    started_at: float
+    finished_at: float
+    timings: Dict[str, tuple]
+
+def process_cve_batch(batch: List[Tuple[int, Tuple[int, str], Optional[bytes]]], worker: Callable = process_cve_file, cprofile_dir: Optional[str] = None) -> BatchResult:
+    """
+    Runs worker on every file of a batch, keeping the file index so results can be put back in order.
+    Each batch item is (index, (year, file_path), data), data being None when the worker has to read the file.
+    The stage timings of the batch are sent back with the results.
+    """
+    started_at = time.time()
+    with worker_cprofile(cprofile_dir):
+        results = [(index, worker(file_arg, data)) for index, file_arg, data in batch]
+    return BatchResult(results=results, pid=os.getpid(), started_at=started_at, finished_at=time.time(), timings=WORKER_TIMINGS.snapshot())
+
+class WorkerStats(NamedTuple):
+    busy: float
+    batches: int
+    files: int
+    last_finished_at: float
+
+def process_cve_files(file_args: List[Tuple[int, str]], worker: Callable = process_cve_file, workers: Optional[int] = None, batches_per_worker: int = 8, io_threads: int = 0, max_prefetched: Optional[int] = None, parent_timings: Optional[StageTimings] = None, worker_timings: Optional[StageTimings] = None, cprofile_dir: Optional[str] = None) -> Tuple[List[Any], Dict[int, WorkerStats], float]:
+    """
+    Processes the files in a process pool, dispatching size-balanced batches largest first.
+    With io_threads, the parent reads the batches ahead in I/O threads and the workers receive the
+    file bytes, so that reads overlap with parsing; at most max_prefetched batches (2 per worker by
+    default) are then read ahead or waiting for a worker.
+    The stage timings of the workers are merged into worker_timings, the time spent by the parent
+    scheduling (stat and sort), prefetching and receiving the results (ipc) goes to parent_timings.
+    Returns the worker results in file_args order, per-worker stats and the wall time of the pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    parent_timings = parent_timings or StageTimings("parent")
+    worker_timings = worker_timings or StageTimings("worker")
+    with parent_timings.stage("schedule", len(file_args)):
+        batches = schedule_by_size(file_args, workers * batches_per_worker)
+    max_prefetched = (max_prefetched or 2 * workers) if io_threads > 0 else len(batches)
+
+    results: List[Any] = [None] * len(file_args)
+    worker_stats: Dict[int, WorkerStats] = {}
+
+    def collect(future: concurrent.futures.Future) -> None:
+        batch_result = future.result()
+        # From the worker finishing the batch to the parent holding the unpickled results
+        parent_timings.add("ipc", time.time() - batch_result.finished_at, len(batch_result.results))
+        worker_timings.merge(batch_result.timings)
+        for index, result in batch_result.results:
+            results[index] = result
+        stats = worker_stats.get(batch_result.pid, WorkerStats(0.0, 0, 0, 0.0))
+        worker_stats[batch_result.pid] = WorkerStats(
+            busy=stats.busy + batch_result.finished_at - batch_result.started_at,
+            batches=stats.batches + 1,
+            files=stats.files + len(batch_result.results),
+            last_finished_at=max(stats.last_finished_at, batch_result.finished_at)
+        )
+        progress.update(len(batch_result.results))
+
+    start = time.time()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=get_worker_context()) as executor:
+        # The first submit forks every worker of a fork pool, so it has to happen while the parent
+        # is still single-threaded, before the I/O threads and the progress bar monitor start
+        executor.submit(os.getpid)
+        if io_threads > 0:
+            ready_batches = prefetch_batches(batches, io_threads, max_prefetched, parent_timings)
+        else:
+            ready_batches = ([(index, file_arg, None) for index, file_arg in batch] for batch in batches)
+        with tqdm(total=len(file_args), desc="Processing CVE files") as progress:
+            in_flight = set()
+            for batch in ready_batches:
+                # Wait for a worker to free a slot before taking the next buffer off the prefetch queue
+                if len(in_flight) >= max_prefetched:
+                    done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                in_flight.add(executor.submit(process_cve_batch, batch, worker, cprofile_dir))
+            for future in concurrent.futures.as_completed(in_flight):
+                collect(future)
+    return results, worker_stats, time.time() - start
+
+def print_worker_stats(worker_stats: Dict[int, WorkerStats], wall_time: float) -> None:
+    """
+    Prints the utilisation of every worker and the tail, i.e. how long the last worker ran
+    after the first one ran out of work.
+    """
+    if not worker_stats:
+        return
+    print(f"Worker utilisation over {wall_time:.2f}s:")
+    for pid, stats in sorted(worker_stats.items()):
+        print(f"  worker {pid}: {stats.files} files in {stats.batches} batches, busy {stats.busy:.2f}s ({stats.busy / wall_time:.0%})")
+    last_finished = [s.last_finished_at for s in worker_stats.values()]
+    print(f"Tail: {max(last_finished) - min(last_finished):.2f}s between the first and the last worker finishing")
+
+def get_worker_context():
+    """
+    Returns the multiprocessing context used for the CVE workers.
+    fork lets the workers inherit the CVE model validator built by the parent instead of
+    importing the model and building it again in every worker.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def preload_cve_model() -> None:
+    """
+    Builds the deferred CVE model validator in the current process.
+    """
+    build_deferred_model(CveJsonRecordFormat)
+
+def load_failed_files(errors_path: str, cve_dir: str) -> List[Tuple[int, str]]:
+    """
+    Returns the (year, file_path) pairs of the files quarantined in an error table, their paths being
+    relative to cve_dir. Files deleted or renamed since the failed run are skipped.
+    """
+    failed = pl.read_parquet(errors_path, columns=["year", "path"])
+    file_args = [(year, os.path.join(cve_dir, path)) for year, path in zip(failed["year"].to_list(), failed["path"].to_list())]
+    found = [(year, file_path) for year, file_path in file_args if os.path.isfile(file_path)]
+    if len(found) < len(file_args):
+        print(f"Skipping {len(file_args) - len(found)} failed files no longer found in {cve_dir}")
+    return found
+
+def merge_retried_rows(output_path: str, retried: Optional[pl.DataFrame], key: str) -> Optional[pl.DataFrame]:
+    """
+    Appends the rows extracted from retried files to an existing output table, replacing any row
+    with the same key.
+    """
+    if not os.path.exists(output_path):
+        return retried
+    existing = pl.read_parquet(output_path)
+    if key == "id":
+        existing = type_cve_columns(existing)
+    else:
+        existing = type_cve_cwe_columns(existing)
+    if retried is None or retried.height == 0:
+        return existing
+    return pl.concat([existing.filter(~pl.col(key).is_in(retried[key].implode())), retried], how="vertical_relaxed")
 
 def main():
     parser = argparse.ArgumentParser(description="Load and validate CVE JSON data from the data/github_cve directory and count submissions by source.")
@@ -142,6 +596,68 @@ def main():
         default=default_cve_dir,
         help="Path to the directory containing CVE JSON files. Defaults to data/github_cve."
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Extract the columns from the raw JSON without validation, only a random sample of the records is fully validated."
+    )
+    parser.add_argument(
+        "--validate-sample",
+        type=float,
+        default=0.01,
+        help="Fraction of the records fully validated in --fast mode. Defaults to 0.01."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed used to draw the --fast validation sample. Defaults to 0."
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=list(JSON_BACKENDS),
+        default="pydantic-core",
+        help="JSON decoder used in --fast mode. Defaults to pydantic-core."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to the number of CPUs."
+    )
+    parser.add_argument(
+        "--batches-per-worker",
+        type=int,
+        default=8,
+        help="Number of size-balanced batches dispatched per worker. Defaults to 8."
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        help="Number of threads prefetching the file bytes for the workers. Defaults to 0, the workers read the files themselves."
+    )
+    parser.add_argument(
+        "--prefetch-batches",
+        type=int,
+        default=None,
+        help="Maximum number of batches read ahead by the --io-threads. Defaults to 2 per worker."
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Write the per-stage timings to this file, as JSON or as Parquet when it ends with .parquet."
+    )
+    parser.add_argument(
+        "--cprofile-dir",
+        default=None,
+        help="Run every worker under cProfile and dump its stats to worker-<pid>.prof in this directory."
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only reprocess the files quarantined in cve_errors.parquet by a previous run, found in --cve-dir, and merge them into the existing outputs."
+    )
     parser.add_argument(
         "--output-dir",
         required=False,
@@ -159,51 +675,97 @@ def main():
     if not os.path.isdir(args.output_dir):
         os.makedirs(args.output_dir, exist_ok=True)
 
+    if args.cprofile_dir:
+        os.makedirs(args.cprofile_dir, exist_ok=True)
+
     cve_compact_data: List[CveData] = []
     cve_cwe_data: List[CveCweData] = []
 
-    # Collect subdirectories (years), sort, and process in order
-    year_dirs = []
-    for entry in os.scandir(args.cve_dir):
-        if entry.is_dir():
-            try:
-                year = int(entry.name)
-                year_dirs.append((year, entry.path))
-            except ValueError:
-                continue  # Skip non-year directories
+    start = time.time()
+    parent_timings = StageTimings("parent")
+    worker_timings = StageTimings("worker")
+    errors_path = os.path.join(args.output_dir, "cve_errors.parquet")
+    scan_start = time.perf_counter()
+    if args.retry_failed:
+        if not os.path.exists(errors_path):
+            print(f"Error: No error table found at {errors_path}")
+            return
+        file_args = load_failed_files(errors_path, args.cve_dir)
+        print(f"Retrying {len(file_args)} failed files from {errors_path}")
+    else:
+        file_args = collect_cve_files(args.cve_dir)
+    parent_timings.add("scan", time.perf_counter() - scan_start, len(file_args))
 
-    # Gather all (year, file_path) pairs
-    file_args = []
-    for year, root in sorted(year_dirs):
-        for filename in sorted(os.listdir(root)):
-            if filename.endswith(".json"):
-                file_path = os.path.join(root, filename)
-                file_args.append((year, file_path))
+    # Build the validator once so that forked workers inherit it
+    preload_cve_model()
+
+    if args.fast:
+        # Fail early rather than in every worker when the backend is not installed
+        get_json_loads(args.json_backend)
+        worker = functools.partial(process_cve_file_fast, json_backend=args.json_backend, sample_rate=args.validate_sample, seed=args.seed)
+    else:
+        worker = process_cve_file
+
+    # Process files in parallel, in size-balanced batches, with progress bar
+    results, worker_stats, wall_time = process_cve_files(
+        file_args, worker, args.workers, args.batches_per_worker, args.io_threads, args.prefetch_batches,
+        parent_timings, worker_timings, args.cprofile_dir
+    )
+    print_worker_stats(worker_stats, wall_time)
 
-    # Process files in parallel with progress bar
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        results = list(tqdm(executor.map(process_cve_file, file_args), total=len(file_args), desc="Processing CVE files"))
+    if args.fast:
+        sampled = [r for r in results if r.sampled]
+        divergences = [r.divergence for r in sampled if r.divergence]
+        print(f"Validated sample: {len(sampled)} records, {len(divergences)} diverging from the strict extraction")
+        for divergence in divergences:
+            print(f"Divergence in {divergence}")
+        failures = [r.failure for r in results if r.failure is not None]
+        results = [r.extracted for r in results]
+    else:
+        failures = [r for r in results if isinstance(r, CveFailure)]
+        results = [r for r in results if isinstance(r, ExtractedCveData)]
 
-    for result in results:
-        if result is None:
-            continue
-        cve_data_obj = result.cve_data
-        cwe_list = result.cwe_list
-        cve_compact_data.append(cve_data_obj)
-        for cwe in cwe_list:
-            cve_cwe_data.append(CveCweData(cve_id=cve_data_obj.id, cwe=cwe))
+    with parent_timings.stage("dataframe build", len(results)):
+        for result in results:
+            if result is None:
+                continue
+            cve_data_obj = result.cve_data
+            cwe_list = result.cwe_list
+            cve_compact_data.append(cve_data_obj)
+            for cwe in cwe_list:
+                cve_cwe_data.append(CveCweData(cve_id=cve_data_obj.id, cwe=cwe))
 
-    df = pl.DataFrame(cve_compact_data)
+        df = type_cve_columns(pl.DataFrame(cve_compact_data))
+        df_cwe = type_cve_cwe_columns(pl.DataFrame(cve_cwe_data)) if cve_cwe_data else None
+        if args.retry_failed:
+            df = merge_retried_rows(os.path.join(args.output_dir, "test.parquet"), df, "id")
+            df_cwe = merge_retried_rows(os.path.join(args.output_dir, "cve_cwe.parquet"), df_cwe, "cve_id")
     print(df)
     # Write output files to the specified output directory
-    df.write_csv(os.path.join(args.output_dir, "test.csv"))
-    df.write_parquet(os.path.join(args.output_dir, "test.parquet"))
+    with parent_timings.stage("csv write", df.height):
+        df.write_csv(os.path.join(args.output_dir, "test.csv"))
+    with parent_timings.stage("parquet write", df.height + (df_cwe.height if df_cwe is not None else 0)):
+        df.write_parquet(os.path.join(args.output_dir, "test.parquet"))
+
+        # Write CVE-CWE pairs to a separate Parquet file
+        if df_cwe is not None:
+            df_cwe.write_parquet(os.path.join(args.output_dir, "cve_cwe.parquet"))
 
-    # Write CVE-CWE pairs to a separate Parquet file
-    if cve_cwe_data:
-        df_cwe = pl.DataFrame(cve_cwe_data)
+        # Quarantine the failed files, a clean run leaves an empty table. The paths are stored relative to
+        # --cve-dir, which a retry resolves them against; skipped files of a retry are dropped from the table
+        pl.DataFrame(
+            [dict(failure.model_dump(), path=os.path.relpath(failure.path, args.cve_dir)) for failure in failures],
+            schema=CVE_FAILURE_SCHEMA
+        ).write_parquet(errors_path)
+    if df_cwe is not None:
         print(df_cwe)
-        df_cwe.write_parquet(os.path.join(args.output_dir, "cve_cwe.parquet"))
+    print(f"{len(failures)} failed files quarantined in {errors_path}")
+
+    if args.profile:
+        total_time = time.time() - start
+        print_profile([parent_timings, worker_timings], total_time)
+        write_profile_report(args.profile, [parent_timings, worker_timings], total_time)
+        print(f"Profile written to {args.profile}")
 
 
 if __name__ == "__main__":
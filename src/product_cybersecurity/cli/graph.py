@@ -1,13 +1,24 @@
-from product_cybersecurity.models.capecparser import  AttackPattern, CapecCollection, RelatedAttackPatternNatureEnum, CapecAbstractionEnum
-from product_cybersecurity.models.cweparser import Cwe, CweCollection, RelatedCweNatureEnum, CweAbstractionEnum
+from product_cybersecurity.models.capecparser import CapecCollection, RelatedAttackPatternNatureEnum, CapecAbstractionEnum
+from product_cybersecurity.models.cweparser import CweCollection, RelatedCweNatureEnum, CweAbstractionEnum
+from product_cybersecurity.models.crossref import CapecCweIndex
 import networkx as nx
 from networkx.readwrite import json_graph
 from enum import Enum
-from typing import List
-from product_cybersecurity.utils.markdownutils import get_markdown_frontmatter
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from product_cybersecurity.utils.cveweights import capec_cve_counts, count_map, cwe_cve_counts
+from product_cybersecurity.utils.graphutils import Closure, force_layout, ordered_subgraph, predecessor_closure, undirected_reachability
+from product_cybersecurity.utils.markdownutils import get_markdown_frontmatter, same_page
+from product_cybersecurity.utils.serializationutils import PRECOMPRESSED_SUFFIX, is_unchanged, load_collection, remove_output, remove_precompressed, write_precompressed
+import html
 import json
 import argparse
+import csv
+import math
 import os
+import time
+import polars as pl
 
 class LabelClassEnum(str, Enum):
     BIG = "node-label-big"
@@ -20,13 +31,246 @@ class SecurityDataEnum(str, Enum):
     CAPEC = "CAPEC"
 
 
-def save_graph_json(graph: nx.Graph, file_path: str):
-    graph_json = json_graph.node_link_data(graph)
-
-    with open(file_path, "w") as f:
-        json.dump(graph_json, f, indent=2)
-
-def capec_graph(capec_collection: CapecCollection) -> nx.DiGraph:
+class GraphFileSize(NamedTuple):
+    file_name: str
+    indented: int
+    written: int
+    gz: Optional[int]
+    changed: bool
+
+# File path, whether it was written, and its sizes for graph files
+WriteResult = Tuple[str, bool, Optional[GraphFileSize]]
+
+class GraphWriter:
+    """
+    Writes node-link graph JSON files: indented, or minified with, optionally, a precompressed
+    .gz sibling for the static site. With measure_sizes, records the size of every graph file
+    along with its size as indented JSON, for print_report and write_report.
+
+    With shared_nodes, the node attributes are written once per node type to a catalogue
+    (write_catalogue) and the graph files only hold node ids and [source, target] links,
+    which the visualiser joins with the catalogue. Node attributes specific to a graph file,
+    those differing from the catalogue, are kept in the file. Without it, remove_catalogue
+    deletes the catalogues of earlier builds.
+
+    With layout, every graph is laid out with force_layout and the nodes get x/y coordinates,
+    so the visualiser does not have to run the whole force simulation.
+
+    Files already holding the content to write are left alone, unless force is set, so that
+    Hugo and the CDN only see the files that changed. With threads, the files are serialised,
+    compressed and written by a thread pool; close waits for them. Layouts and catalogue lookups
+    are done by the calling thread, which alone fills their caches.
+    """
+    def __init__(self, minify: bool = False, precompress: bool = False, shared_nodes: bool = False, layout: bool = False, threads: int = 0, force: bool = False, measure_sizes: bool = False):
+        self.minify = minify
+        self.precompress = precompress
+        self.shared_nodes = shared_nodes
+        self.layout = layout
+        self.force = force
+        self.measure_sizes = measure_sizes
+        self.layout_time = 0.0
+        self.sizes: List[GraphFileSize] = []
+        self.written: List[str] = []
+        self.skipped: List[str] = []
+        self.removed: List[str] = []
+        self._executor = ThreadPoolExecutor(max_workers=threads) if threads > 0 else None
+        self._pending: List[Future] = []
+        # Catalogue file name and attributes of every node written to a catalogue
+        self._catalogues: Dict[str, Tuple[str, dict]] = {}
+        # Layouts by node and edge sets, the META CAPEC subgraphs of a component are the same graph
+        self._layouts: Dict[Tuple[FrozenSet, FrozenSet], Dict[str, List[int]]] = {}
+
+    def positions(self, graph: nx.Graph) -> Dict[str, List[int]]:
+        """
+        Returns the [x, y] coordinates of every node, rounded to the pixel.
+        """
+        key = (frozenset(graph.nodes), frozenset(graph.edges))
+        if key not in self._layouts:
+            start = time.perf_counter()
+            self._layouts[key] = {node: [round(x), round(y)] for node, (x, y) in force_layout(graph).items()}
+            self.layout_time += time.perf_counter() - start
+        return self._layouts[key]
+
+    def write_catalogue(self, graph: nx.Graph, file_path: str) -> None:
+        """
+        Writes the attributes of every node of graph, keyed by node id, and makes the graph
+        files written afterwards refer to this catalogue for these nodes.
+        """
+        catalogue = {"nodes": {node: attributes for node, attributes in graph.nodes(data=True)}}
+        self._submit(self._write_json, catalogue, catalogue, file_path)
+        for node, attributes in graph.nodes(data=True):
+            self._catalogues[node] = (os.path.basename(file_path), attributes)
+
+    def remove_catalogue(self, file_path: str) -> None:
+        """
+        Removes a catalogue and its precompressed copies left by a build with shared nodes.
+        """
+        if remove_output(file_path):
+            self.removed.append(file_path)
+
+    def write(self, graph: nx.Graph, file_path: str) -> None:
+        positions = self.positions(graph) if self.layout else None
+        catalogues = {self._catalogues[node][0] if node in self._catalogues else None for node in graph.nodes}
+        catalogue = catalogues.pop() if self.shared_nodes and len(catalogues) == 1 and None not in catalogues else None
+        self._submit(self._write_graph, graph, file_path, positions, catalogue)
+
+    def write_client_settings(self, file_path: str) -> None:
+        """
+        Writes the script telling the visualiser which copies of the graph files this build wrote,
+        so that it only fetches the .gz copies when they exist.
+        """
+        settings = {"precompressed": self.precompress}
+        self._submit(self._write_text, file_path, f"const graphFiles = {json.dumps(settings)};\n")
+
+    def write_markdown(self, file_path: str, page: str) -> None:
+        """
+        Writes a markdown page, unless the existing one only differs by its frontmatter date.
+        """
+        self._submit(self._write_markdown, file_path, page)
+
+    def close(self) -> None:
+        """
+        Waits for the pending writes, raising their errors, and stops the thread pool.
+        """
+        # Recorded in submission order, so the reports do not depend on thread scheduling
+        for future in self._pending:
+            self._record(future.result())
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _submit(self, write: Callable[..., WriteResult], *args) -> None:
+        if self._executor is None:
+            self._record(write(*args))
+        else:
+            self._pending.append(self._executor.submit(write, *args))
+
+    def _record(self, result: WriteResult) -> None:
+        file_path, changed, size = result
+        (self.written if changed else self.skipped).append(file_path)
+        if size is not None:
+            self.sizes.append(size)
+
+    def _write_graph(self, graph: nx.Graph, file_path: str, positions: Optional[Dict[str, List[int]]], catalogue: Optional[str]) -> WriteResult:
+        # Pinned to "links", the key the visualiser reads, as the networkx default changed to "edges"
+        graph_json = json_graph.node_link_data(graph, edges="links")
+        if positions:
+            for node in graph_json["nodes"]:
+                node["x"], node["y"] = positions[node["id"]]
+        if catalogue is not None:
+            edge_list = {
+                "directed": graph.is_directed(),
+                "catalogue": catalogue,
+                "nodes": list(graph.nodes),
+                "links": [[source, target] for source, target in graph.edges],
+            }
+            if graph.graph:
+                edge_list["graph"] = graph.graph
+            if positions:
+                edge_list["positions"] = [positions[node] for node in graph.nodes]
+            attributes = {}
+            for node, node_attributes in graph.nodes(data=True):
+                catalogue_attributes = self._catalogues[node][1]
+                specific = {key: value for key, value in node_attributes.items() if key not in catalogue_attributes or catalogue_attributes[key] != value}
+                if specific:
+                    attributes[node] = specific
+            if attributes:
+                edge_list["attributes"] = attributes
+            return self._write_json(edge_list, graph_json, file_path)
+        return self._write_json(graph_json, graph_json, file_path)
+
+    def _write_markdown(self, file_path: str, page: str) -> WriteResult:
+        if not self.force and os.path.exists(file_path):
+            with open(file_path, encoding="utf-8") as f:
+                if same_page(f.read(), page):
+                    return file_path, False, None
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(page)
+        return file_path, True, None
+
+    def _write_text(self, file_path: str, text: str) -> WriteResult:
+        data = text.encode("utf-8")
+        if not self.force and is_unchanged(file_path, data):
+            return file_path, False, None
+        with open(file_path, "wb") as f:
+            f.write(data)
+        return file_path, True, None
+
+    def _write_json(self, content: dict, baseline: dict, file_path: str) -> WriteResult:
+        """
+        Writes content and, with measure_sizes, records its sizes, compared with baseline written
+        as indented JSON.
+        """
+        if self.minify:
+            data = json.dumps(content, separators=(",", ":")).encode("utf-8")
+        else:
+            data = json.dumps(content, indent=2).encode("utf-8")
+        suffixes = ("", PRECOMPRESSED_SUFFIX) if self.precompress else ("",)
+        # The precompressed copy is deterministic, it is up to date when the file is
+        changed = self.force or not is_unchanged(file_path, data) or not all(os.path.exists(file_path + suffix) for suffix in suffixes)
+        if changed and self.precompress:
+            write_precompressed(file_path, data)
+        elif changed:
+            with open(file_path, "wb") as f:
+                f.write(data)
+        # Copies left by a build with other options would be fetched instead of the file
+        changed = remove_precompressed(file_path, keep=suffixes) or changed
+        if not self.measure_sizes:
+            return file_path, changed, None
+        indented = data if content is baseline and not self.minify else json.dumps(baseline, indent=2).encode("utf-8")
+        gz = os.path.getsize(file_path + PRECOMPRESSED_SUFFIX) if self.precompress else None
+        return file_path, changed, GraphFileSize(os.path.basename(file_path), len(indented), len(data), gz, changed)
+
+    def print_report(self, largest: int = 5) -> None:
+        """
+        Prints the size savings over indented JSON for the largest files and in total.
+        """
+        def describe(size: GraphFileSize) -> str:
+            line = f"{size.file_name}: {size.indented / 1e3:.1f} kB indented -> {size.written / 1e3:.1f} kB"
+            if size.gz is not None:
+                line += f", {size.gz / 1e3:.1f} kB gz ({1 - size.gz / size.indented:.0%} saved)"
+            return line
+
+        if not self.sizes:
+            return
+        print("Graph file sizes:")
+        for size in sorted(self.sizes, key=lambda s: s.indented, reverse=True)[:largest]:
+            print(f"  {describe(size)}")
+        gz = [s.gz for s in self.sizes]
+        total = GraphFileSize(
+            f"total of {len(self.sizes)} files",
+            sum(s.indented for s in self.sizes),
+            sum(s.written for s in self.sizes),
+            sum(gz) if None not in gz else None,
+            any(s.changed for s in self.sizes)
+        )
+        print(f"  {describe(total)}")
+
+    def print_summary(self, listed: int = 10) -> None:
+        """
+        Prints the files written, the unchanged files skipped and the stale files removed.
+        """
+        for title, files in (("Written", self.written), ("Skipped, unchanged", self.skipped), ("Removed", self.removed)):
+            print(f"{title}: {len(files)} files")
+            for file_path in files[:listed]:
+                print(f"  {file_path}")
+            if len(files) > listed:
+                print(f"  ... and {len(files) - listed} more")
+
+    def write_report(self, report_path: str) -> None:
+        """
+        Writes the size of every graph file as CSV.
+        """
+        with open(report_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(GraphFileSize._fields)
+            writer.writerows(self.sizes)
+
+def save_graph_json(graph: nx.Graph, file_path: str, writer: Optional[GraphWriter] = None):
+    (writer or GraphWriter()).write(graph, file_path)
+
+def capec_graph(capec_collection: CapecCollection, capec_cwe_index: Optional[CapecCweIndex] = None) -> nx.DiGraph:
     G_capec: nx.DiGraph = nx.DiGraph()
     for capec in capec_collection.Capecs.values():
         G_capec.add_node(capec.ID)
@@ -63,37 +307,153 @@ def capec_graph(capec_collection: CapecCollection) -> nx.DiGraph:
         G_capec.nodes[node]["type"] = SecurityDataEnum.CAPEC
         G_capec.nodes[node]["abstraction"] = capec_collection.Capecs[node].Abstraction
         G_capec.nodes[node]["url"] = f"https://capec.mitre.org/data/definitions/{capec_collection.Capecs[node].Number}.html"
+        if capec_cwe_index is not None:
+            G_capec.nodes[node]["related_cwes"] = capec_cwe_index.cwes_for_capec(node)
     
     return G_capec
 
-def save_capec_subgraphs(capec_graph: nx.DiGraph, capec_collection: CapecCollection, output_dir: str) -> None:
-    meta_capec = []
-    for capec_k, capec in capec_collection.Capecs.items():
-        if capec.Abstraction == CapecAbstractionEnum.META:
-            meta_capec.append(capec)
-            G_undirected = capec_graph.to_undirected()
-            nodes_bfs = list(nx.bfs_tree(G_undirected, capec.ID))
-            capec_subgraph = capec_graph.subgraph(nodes_bfs)
-            save_graph_json(capec_subgraph, os.path.join(output_dir, f"{capec.ID}.json"))
-
-def save_capec_md(capec_collection: CapecCollection, md_filepath: str) -> None:
-    meta_capec : List[AttackPattern] = []
+# Colours of the nodes with the fewest and the most CVEs, per node type
+CVE_COLOR_SCALES = {
+    SecurityDataEnum.CWE: ("#fff3cc", "#b3001b"),
+    SecurityDataEnum.CAPEC: ("#dbe9ff", "#0b3d91"),
+}
+
+def blend_color(light: str, dark: str, share: float) -> str:
+    channels = [round(int(light[i:i + 2], 16) * (1 - share) + int(dark[i:i + 2], 16) * share) for i in (1, 3, 5)]
+    return "#" + "".join(f"{channel:02x}" for channel in channels)
+
+def add_cve_weights(graph: nx.DiGraph, counts: Dict[str, Tuple[int, int]], cumulative_label: str) -> None:
+    """
+    Adds the direct and cumulative CVE counts of every node to its attributes and tooltip, and
+    sizes and colours the nodes by their cumulative count on a log scale, instead of by abstraction.
+    """
+    largest = max((cumulative for _, cumulative in counts.values()), default=0)
+    for node, attributes in graph.nodes(data=True):
+        direct, cumulative = counts.get(node, (0, 0))
+        share = math.log1p(cumulative) / math.log1p(largest) if largest else 0.0
+        attributes["cve_direct"] = direct
+        attributes["cve_cumulative"] = cumulative
+        attributes["size"] = round(6 + 24 * share)
+        attributes["color"] = blend_color(*CVE_COLOR_SCALES[attributes["type"]], share)
+        attributes["Description"] += f"<br><i>CVEs: {direct} direct, {cumulative} {cumulative_label}</i>"
+
+def weight_graphs(capec_graph: nx.DiGraph, capec_collection: CapecCollection, cwe_graph: nx.DiGraph, cve_cwe: pl.DataFrame) -> None:
+    """
+    Weights the CWE nodes by the CVEs of the CWE and its descendants in the ChildOf graph, and the
+    CAPEC nodes by the CVEs of their related weaknesses and their descendants.
+    """
+    descendants = predecessor_closure(cwe_graph)
+    cwe_counts = cwe_cve_counts(cve_cwe, descendants)
+    related_weaknesses = [(capec.ID, cwe) for capec in capec_collection.Capecs.values() for cwe in capec.Related_Weaknesses or []]
+    capec_counts = capec_cve_counts(cve_cwe, descendants, related_weaknesses)
+    add_cve_weights(cwe_graph, count_map(cwe_counts, "cwe"), "including descendants")
+    add_cve_weights(capec_graph, count_map(capec_counts, "capec"), "including descendants of the related weaknesses")
+
+def capec_subgraphs(capec_graph: nx.DiGraph, capec_collection: CapecCollection) -> Dict[str, nx.DiGraph]:
+    # The nodes reachable from a Meta CAPEC in the undirected graph form its weakly connected
+    # component, all of them are computed in one pass
+    reachable = undirected_reachability(capec_graph)
+    return {
+        capec.ID: ordered_subgraph(capec_graph, reachable[capec.ID])
+        for capec in capec_collection.Capecs.values()
+        if capec.Abstraction == CapecAbstractionEnum.META
+    }
+
+def save_subgraphs(subgraphs: Dict[str, nx.DiGraph], output_dir: str, writer: Optional[GraphWriter] = None) -> None:
+    for entry_id, subgraph in subgraphs.items():
+        save_graph_json(subgraph, os.path.join(output_dir, f"{entry_id}.json"), writer)
+
+def page_link(entry_id: str, depth: int) -> str:
+    """
+    Returns the relative link to the page of a CWE or CAPEC (save_entry_pages) from a page
+    published depth directories below the markdown directory.
+    """
+    kind = entry_id.split("-")[0].lower()
+    return "../" * depth + f"{kind}/{entry_id.lower()}/"
+
+def visualizer_link(entry_id: str, depth: int) -> str:
+    return "../" * (depth + 1) + f"visualizer.html?jsonfile={entry_id}.json"
+
+def entry_list(entry_ids: List[str], names: Dict[str, str], depth: int) -> List[str]:
+    """
+    Returns a markdown list linking to the pages of the entries, the ones without a page as plain ids.
+    """
+    return [f"- [{entry_id} {names[entry_id]}]({page_link(entry_id, depth)})" if entry_id in names else f"- {entry_id}" for entry_id in entry_ids]
+
+def text_paragraphs(*texts: Optional[str]) -> List[str]:
+    """
+    Returns plain text descriptions as markdown paragraphs: HTML escaped, as the site renders raw
+    HTML, and on a single line, as indented lines would turn into code blocks.
+    """
+    return [html.escape(" ".join(text.split()), quote=False) + "\n" for text in texts if text]
+
+def entry_page(graph: nx.DiGraph, entry_id: str, name: str, facts: List[str], description: List[str], related_key: str, names: Dict[str, str], has_graph: bool) -> str:
+    """
+    Returns the page of a CWE or CAPEC: its facts and description, a link to its subgraph, and its
+    parents and children in the ChildOf graph (edges go from child to parent) and related entries.
+    """
+    md = get_markdown_frontmatter(f"{entry_id}: {name}", draft=False, unlisted=True)
+    md.append(" | ".join(facts))
+    md.append("")
+    md += description
+    if has_graph:
+        md.append(f"[Graph of {entry_id} and its related entries]({visualizer_link(entry_id, 2)})")
+        md.append("")
+    sections = (
+        ("Parents", sorted(graph.successors(entry_id))),
+        ("Children", sorted(graph.predecessors(entry_id))),
+        ("Related", graph.nodes[entry_id].get(related_key, [])),
+    )
+    for title, entry_ids in sections:
+        if entry_ids:
+            md.append(f"## {title}")
+            md += entry_list(entry_ids, names, 2)
+            md.append("")
+    return '\n'.join(md)
+
+def save_entry_pages(capec_graph: nx.DiGraph, capec_collection: CapecCollection, cwe_graph: nx.DiGraph, cwe_collection: CweCollection, md_dir: str, writer: Optional[GraphWriter] = None) -> int:
+    """
+    Writes one page per CAPEC to md_dir/capec and per CWE to md_dir/cwe, and returns their number.
+    Each page is built from the graph adjacency of its entry, in time linear in its size.
+    """
+    writer = writer or GraphWriter()
+    names = {capec.ID: capec.Name for capec in capec_collection.Capecs.values()}
+    names.update({cwe.ID: cwe.Name for cwe in cwe_collection.CWEs.values()})
+    for kind in ("capec", "cwe"):
+        os.makedirs(os.path.join(md_dir, kind), exist_ok=True)
 
     for capec in capec_collection.Capecs.values():
-        if capec.Abstraction == CapecAbstractionEnum.META:
-            meta_capec.append(capec)
-    
+        facts = [f"**Abstraction:** {capec.Abstraction.value}", f"**Status:** {capec.Status.value}"]
+        if capec.Likelihood_Of_Attack:
+            facts.append(f"**Likelihood of attack:** {capec.Likelihood_Of_Attack}")
+        if capec.Typical_Severity:
+            facts.append(f"**Typical severity:** {capec.Typical_Severity}")
+        description = text_paragraphs(capec.Description, capec.Extended_Description)
+        page = entry_page(capec_graph, capec.ID, capec.Name, facts, description, "related_cwes", names, capec.Abstraction == CapecAbstractionEnum.META)
+        writer.write_markdown(os.path.join(md_dir, "capec", f"{capec.ID}.md"), page)
+
+    for cwe in cwe_collection.CWEs.values():
+        facts = [f"**Abstraction:** {cwe.Abstraction.value}", f"**Status:** {cwe.Status.value}"]
+        description = text_paragraphs(cwe.Description, cwe.Extended_Description)
+        has_graph = cwe.Abstraction in (CweAbstractionEnum.PILLAR, CweAbstractionEnum.CLASS)
+        page = entry_page(cwe_graph, cwe.ID, cwe.Name, facts, description, "related_capecs", names, has_graph)
+        writer.write_markdown(os.path.join(md_dir, "cwe", f"{cwe.ID}.md"), page)
+
+    return len(capec_collection.Capecs) + len(cwe_collection.CWEs)
+
+def save_capec_md(capec_collection: CapecCollection, md_filepath: str, writer: Optional[GraphWriter] = None) -> None:
+    meta_capec = [capec for capec in capec_collection.Capecs.values() if capec.Abstraction == CapecAbstractionEnum.META]
+
     sorted_metacapec = sorted(meta_capec, key=lambda x: x.Name)
     md = get_markdown_frontmatter("CAPEC List", draft=False)
     md.append("## List of Meta CAPECs")
     for c in sorted_metacapec:
-        md.append(f"- [{c.ID} {c.Name}](../../visualizer.html?jsonfile={c.ID}.json)")
+        md.append(f"- [{c.ID} {c.Name}]({visualizer_link(c.ID, 1)}) ([details]({page_link(c.ID, 1)}))")
 
-    with open(md_filepath, "w") as f:
-        f.write('\n'.join(md))
+    (writer or GraphWriter()).write_markdown(md_filepath, '\n'.join(md))
     
 
-def cwe_graph(cwe_collection : CweCollection)-> nx.DiGraph:
+def cwe_graph(cwe_collection : CweCollection, capec_cwe_index: Optional[CapecCweIndex] = None)-> nx.DiGraph:
     G_cwe: nx.DiGraph = nx.DiGraph()
 
     for cwe in cwe_collection.CWEs.values():
@@ -139,90 +499,200 @@ def cwe_graph(cwe_collection : CweCollection)-> nx.DiGraph:
         G_cwe.nodes[node]["type"] = SecurityDataEnum.CWE
         G_cwe.nodes[node]["abstraction"] = cwe_collection.CWEs[node].Abstraction
         G_cwe.nodes[node]["url"] = f"https://cwe.mitre.org/data/definitions/{cwe_collection.CWEs[node].Number}.html"
+        if capec_cwe_index is not None:
+            G_cwe.nodes[node]["related_capecs"] = capec_cwe_index.capecs_for_cwe(node)
     
     return G_cwe
 
-def save_cwe_subgraphs(cwe_graph: nx.DiGraph, cwe_collection: CweCollection, output_dir: str) -> None:
-    for cwe in cwe_collection.CWEs.values():
-        if(cwe.Abstraction == CweAbstractionEnum.PILLAR or cwe.Abstraction == CweAbstractionEnum.CLASS):
-            nodes_rbfs = reverse_bfs(cwe_graph, cwe.ID)
-            cwe_subgraph = cwe_graph.subgraph(nodes_rbfs)
-            save_graph_json(cwe_subgraph, os.path.join(output_dir, f"{cwe.ID}.json"))
-
-def save_cwe_md(cwe_collection: CweCollection, md_filepath: str) -> None:
-    pillar_cwe : List[Cwe] = []
-    class_cwe : List[Cwe] = []
-
-    for cwe in cwe_collection.CWEs.values():
-        if cwe.Abstraction == CweAbstractionEnum.PILLAR:
-            pillar_cwe.append(cwe)
-        elif cwe.Abstraction == CweAbstractionEnum.CLASS:
-            class_cwe.append(cwe)
+def cwe_subgraphs(cwe_graph: nx.DiGraph, cwe_collection: CweCollection) -> Dict[str, nx.DiGraph]:
+    # Edges go from child to parent, so the nodes with a path to a CWE are its descendants
+    descendants = predecessor_closure(cwe_graph)
+    return {
+        cwe.ID: ordered_subgraph(cwe_graph, descendants[cwe.ID])
+        for cwe in cwe_collection.CWEs.values()
+        if cwe.Abstraction == CweAbstractionEnum.PILLAR or cwe.Abstraction == CweAbstractionEnum.CLASS
+    }
+
+def lod_graph(graph: nx.DiGraph, descendants: Closure, visible: Set[str], previous: Optional[Set[str]]) -> nx.DiGraph:
+    """
+    Returns the level of detail of a ChildOf graph (edges from child to parent) showing the visible
+    nodes only. Every node links to its nearest visible ancestors and carries the number of its
+    descendants collapsed into it, if any, overall and per abstraction. The nodes new since the previous
+    level list the nodes of that level they are expanded from, their nearest ancestors in it.
+    """
+    def nearest(node: str, shown: Set[str]) -> List[str]:
+        found: List[str] = []
+        seen = {node}
+        queue = deque(graph.successors(node))
+        while queue:
+            ancestor = queue.popleft()
+            if ancestor in seen:
+                continue
+            seen.add(ancestor)
+            if ancestor in shown:
+                found.append(ancestor)
+            else:
+                queue.extend(graph.successors(ancestor))
+        return found
+
+    hidden_by_abstraction: Dict[str, Set[str]] = {}
+    for node, abstraction in graph.nodes(data="abstraction"):
+        if node not in visible:
+            hidden_by_abstraction.setdefault(abstraction.value, set()).add(node)
+    hidden_masks = {abstraction: descendants.mask(nodes) for abstraction, nodes in hidden_by_abstraction.items()}
+
+    lod: nx.DiGraph = nx.DiGraph()
+    for node in graph.nodes:
+        if node not in visible:
+            continue
+        collapsed = {abstraction: descendants.count(node, mask) for abstraction, mask in hidden_masks.items()}
+        collapsed = {abstraction: count for abstraction, count in collapsed.items() if count}
+        lod.add_node(node, **graph.nodes[node])
+        if collapsed:
+            lod.nodes[node]["collapsed"] = sum(collapsed.values())
+            lod.nodes[node]["collapsed_abstractions"] = collapsed
+        if previous is not None and node not in previous:
+            lod.nodes[node]["expands_from"] = nearest(node, previous)
+    for node in lod.nodes:
+        for ancestor in nearest(node, visible):
+            lod.add_edge(node, ancestor)
+    return lod
+
+def save_lod_graphs(graph: nx.DiGraph, levels: List[Set[str]], file_prefix: str, writer: Optional[GraphWriter] = None) -> None:
+    """
+    Writes the levels of detail of a ChildOf graph to file_prefix0.json, file_prefix1.json, ...:
+    one per set of abstractions in levels, then the full graph. Every file names the next one,
+    which the visualiser loads when a collapsed node is expanded.
+    """
+    descendants = predecessor_closure(graph)
+    visible_levels = [{node for node, abstraction in graph.nodes(data="abstraction") if abstraction.value in abstractions} for abstractions in levels]
+    visible_levels.append(set(graph.nodes))
+    previous: Optional[Set[str]] = None
+    for level, visible in enumerate(visible_levels):
+        lod = lod_graph(graph, descendants, visible, previous)
+        lod.graph["lod_level"] = level
+        lod.graph["lod_next"] = f"{os.path.basename(file_prefix)}{level + 1}.json" if level + 1 < len(visible_levels) else None
+        save_graph_json(lod, f"{file_prefix}{level}.json", writer)
+        previous = visible
+
+def save_cwe_md(cwe_collection: CweCollection, cwe_graph: nx.DiGraph, md_filepath: str, writer: Optional[GraphWriter] = None) -> None:
+    pillar_cwe = [cwe for cwe in cwe_collection.CWEs.values() if cwe.Abstraction == CweAbstractionEnum.PILLAR]
 
     sorted_pillar_cwe = sorted(pillar_cwe, key=lambda x: x.Name)
-    sorted_class_cwe = sorted(class_cwe, key=lambda x: x.Name)
     md = get_markdown_frontmatter("CWE List", draft=False)
     md.append("# List of Pillar CWEs with class CWEs")
     for pil in sorted_pillar_cwe:
-        md.append(f"### [{pil.ID} {pil.Name}](../../visualizer.html?jsonfile={pil.ID}.json)")
-        for cla in sorted_class_cwe:
-            if cla.Related_CWEs:
-                for rel in cla.Related_CWEs:
-                    if rel.CWE_ID == pil.ID and rel.Nature == RelatedCweNatureEnum.CHILD_OF:
-                        md.append(f"- [{cla.ID} {cla.Name}](../../visualizer.html?jsonfile={cla.ID}.json)")
+        md.append(f"### [{pil.ID} {pil.Name}]({visualizer_link(pil.ID, 1)}) ([details]({page_link(pil.ID, 1)}))")
+        # ChildOf edges go from child to parent, the predecessors of a pillar are its children
+        children = [cwe_collection.CWEs[child] for child in cwe_graph.predecessors(pil.ID)]
+        for cla in sorted((child for child in children if child.Abstraction == CweAbstractionEnum.CLASS), key=lambda x: x.Name):
+            md.append(f"- [{cla.ID} {cla.Name}]({visualizer_link(cla.ID, 1)}) ([details]({page_link(cla.ID, 1)}))")
         md.append("")
 
-    with open(md_filepath, "w") as f:
-        f.write('\n'.join(md))
-
-def reverse_bfs(graph, start):
-    visited = set()
-    queue = [start]
-    while queue:
-        node = queue.pop(0)
-        if node not in visited:
-            visited.add(node)
-            queue.extend(set(graph.predecessors(node)) - visited)
-    return visited
+    (writer or GraphWriter()).write_markdown(md_filepath, '\n'.join(md))
 
 def main():
     parser = argparse.ArgumentParser(description="Generate graphs from CAPEC and CWE data.")
-    parser.add_argument("--capec-json", required=True, help="Path to CAPEC JSON file.")
-    parser.add_argument("--cwe-json", required=True, help="Path to CWE JSON file.")
+    parser.add_argument("--capec-json", required=True, help="Path to CAPEC JSON file. The compact artefact next to it is used when up to date.")
+    parser.add_argument("--cwe-json", required=True, help="Path to CWE JSON file. The compact artefact next to it is used when up to date.")
+    parser.add_argument("--capec-cwe-json", help="Optional path to the CAPEC <-> CWE index JSON file, used to annotate nodes with their related entries.")
     parser.add_argument("--graph-dir", required=True, help="Directory to save graph JSON files.")
     parser.add_argument("--md-dir", required=True, help="Directory to save markdown files.")
+    parser.add_argument("--cve-cwe-parquet", help="Optional path to the cve_cwe.parquet table of cveviz_github.py, used to size and colour the nodes by their number of CVEs. Skipped when the file does not exist.")
+    parser.add_argument("--minify", action="store_true", help="Write minified graph JSON instead of indented JSON.")
+    parser.add_argument("--precompress", action="store_true", help="Also write a .gz precompressed copy of every graph file, which the visualiser fetches and decompresses. Without it, the .gz copies of earlier builds are removed.")
+    parser.add_argument("--shared-nodes", action="store_true", help="Write the node attributes once to CWE-nodes.json and CAPEC-nodes.json, the graph files then only hold node ids and links. Without it, the catalogues of earlier builds are removed.")
+    parser.add_argument("--layout", action="store_true", help="Lay every graph out offline and write x/y coordinates into its nodes, the visualiser then only refines the layout.")
+    parser.add_argument("--write-threads", type=int, default=min(8, os.cpu_count() or 1), help="Number of threads serialising, compressing and writing the output files, 0 to write them from the main thread. Defaults to the number of CPUs, up to 8.")
+    parser.add_argument("--force", action="store_true", help="Rewrite every output file, even when its content has not changed.")
+    parser.add_argument("--size-report", help="Measure the size of every graph file, indented, as written and compressed, print the savings and write the sizes to this CSV file.")
     args = parser.parse_args()
 
     os.makedirs(args.graph_dir, exist_ok=True)
     os.makedirs(args.md_dir, exist_ok=True)
 
+    start = time.perf_counter()
+    writer = GraphWriter(minify=args.minify, precompress=args.precompress, shared_nodes=args.shared_nodes, layout=args.layout, threads=args.write_threads, force=args.force, measure_sizes=bool(args.size_report))
+    capec_cwe_index = load_collection(CapecCweIndex, args.capec_cwe_json) if args.capec_cwe_json else None
+
+    writer.write_client_settings(os.path.join(args.graph_dir, "graph-files.js"))
+
     print("Creating Capec Graphs")
-    with open(args.capec_json, "r") as f:
-        capec_collection = CapecCollection.model_validate_json(f.read())
-    
-    G_capec = capec_graph(capec_collection)
+    capec_collection = load_collection(CapecCollection, args.capec_json)
+    G_capec = capec_graph(capec_collection, capec_cwe_index)
+
+    print("Creating Cwe Graphs")
+    cwe_collection = load_collection(CweCollection, args.cwe_json)
+    G_cwe = cwe_graph(cwe_collection, capec_cwe_index)
+
+    if args.cve_cwe_parquet and os.path.exists(args.cve_cwe_parquet):
+        print("Weighting nodes by CVE counts")
+        step_start = time.perf_counter()
+        weight_graphs(G_capec, capec_collection, G_cwe, pl.read_parquet(args.cve_cwe_parquet))
+        print(f"CVE weights computed in {time.perf_counter() - step_start:.2f}s")
+    elif args.cve_cwe_parquet:
+        print(f"{args.cve_cwe_parquet} not found, nodes are not weighted by CVE counts")
+
+    if args.shared_nodes:
+        print("Saving CAPEC node catalogue")
+        writer.write_catalogue(G_capec, os.path.join(args.graph_dir, "CAPEC-nodes.json"))
+    else:
+        writer.remove_catalogue(os.path.join(args.graph_dir, "CAPEC-nodes.json"))
     print("saving CAPEC full graph")
-    save_graph_json(G_capec, os.path.join(args.graph_dir, "CAPEC-FULL.json"))
+    save_graph_json(G_capec, os.path.join(args.graph_dir, "CAPEC-FULL.json"), writer)
     
+    print("Saving CAPEC level of detail graphs")
+    save_lod_graphs(G_capec, [{CapecAbstractionEnum.META.value}, {CapecAbstractionEnum.META.value, CapecAbstractionEnum.STANDARD.value}], os.path.join(args.graph_dir, "CAPEC-LOD"), writer)
+
     print("Saving META CAPEC subgraphs")
-    save_capec_subgraphs(G_capec, capec_collection, args.graph_dir)
+    # Timed apart from the writes, which may still be running in the writer threads
+    step_start = time.perf_counter()
+    meta_capec_subgraphs = capec_subgraphs(G_capec, capec_collection)
+    print(f"{len(meta_capec_subgraphs)} META CAPEC subgraphs computed in {time.perf_counter() - step_start:.2f}s")
+    save_subgraphs(meta_capec_subgraphs, args.graph_dir, writer)
 
     print("Saving CAPEC index markdown file")
-    save_capec_md(capec_collection, os.path.join(args.md_dir, "CAPECs.md"))
+    save_capec_md(capec_collection, os.path.join(args.md_dir, "CAPECs.md"), writer)
 
-    print("Creating Cwe Graphs")
-    with open(args.cwe_json, "r") as f:
-        cwe_collection = CweCollection.model_validate_json(f.read())
-    
-    G_cwe = cwe_graph(cwe_collection)
+    if args.shared_nodes:
+        print("Saving CWE node catalogue")
+        writer.write_catalogue(G_cwe, os.path.join(args.graph_dir, "CWE-nodes.json"))
+    else:
+        writer.remove_catalogue(os.path.join(args.graph_dir, "CWE-nodes.json"))
     print("Saving full CWE Graph")
-    save_graph_json(G_cwe, os.path.join(args.graph_dir, "CWE-FULL.json"))
+    save_graph_json(G_cwe, os.path.join(args.graph_dir, "CWE-FULL.json"), writer)
+
+    print("Saving CWE level of detail graphs")
+    save_lod_graphs(G_cwe, [{CweAbstractionEnum.PILLAR.value}, {CweAbstractionEnum.PILLAR.value, CweAbstractionEnum.CLASS.value}], os.path.join(args.graph_dir, "CWE-LOD"), writer)
 
     print("Saving Pillar and Class subgraphs")
-    save_cwe_subgraphs(G_cwe, cwe_collection, args.graph_dir)
+    step_start = time.perf_counter()
+    pillar_class_subgraphs = cwe_subgraphs(G_cwe, cwe_collection)
+    print(f"{len(pillar_class_subgraphs)} Pillar and Class subgraphs computed in {time.perf_counter() - step_start:.2f}s")
+    save_subgraphs(pillar_class_subgraphs, args.graph_dir, writer)
 
     print("Saving CWE index markdown file")
-    save_cwe_md(cwe_collection, os.path.join(args.md_dir, "CWEs.md"))
+    save_cwe_md(cwe_collection, G_cwe, os.path.join(args.md_dir, "CWEs.md"), writer)
+
+    print("Saving CAPEC and CWE pages")
+    step_start = time.perf_counter()
+    pages = save_entry_pages(G_capec, capec_collection, G_cwe, cwe_collection, args.md_dir, writer)
+    print(f"{pages} CAPEC and CWE pages generated in {time.perf_counter() - step_start:.2f}s")
+
+    if args.layout:
+        print(f"Graph layouts computed in {writer.layout_time:.2f}s")
+
+    print("Waiting for the output files to be written")
+    step_start = time.perf_counter()
+    writer.close()
+    print(f"Output files written in {time.perf_counter() - step_start:.2f}s after the last one was submitted")
+    print(f"Graph generation finished in {time.perf_counter() - start:.2f}s")
+
+    writer.print_summary()
+    if args.size_report:
+        writer.print_report()
+        writer.write_report(args.size_report)
+        print(f"Size report written to {args.size_report}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,9 +3,14 @@ import os
 import gzip
 import glob
 import zipfile
+import time
+import concurrent.futures
+import polars as pl
 from tqdm import tqdm
 from product_cybersecurity.models.capecparser import parse_capec_xml_pydantic
 from product_cybersecurity.models.cweparser import parse_cwe_xml, CweStatusEnum
+from product_cybersecurity.models.crossref import build_capec_cwe_index, cwe_ancestor_rows, cwe_capec_rows
+from product_cybersecurity.utils.serializationutils import save_compact, compact_path
 
 def decompress_cves(source_dir, dest_dir):
     """
@@ -94,60 +99,151 @@ def unzip_github_cves(zip_path, dest_dir):
     print(f"CVE files unzipped to {dest_dir}")
 
 
+def convert_capec(capec_xml, capec_json):
+    """
+    Parses the CAPEC XML file and writes the CAPEC collection as readable JSON,
+    plus a compact artefact next to it.
+    """
+    print("Converting CAPECs to JSON")
+    with open(capec_xml, 'r', encoding='UTF-8') as file:
+        xml_content = file.read()
+
+    attack_patterns_pydantic = parse_capec_xml_pydantic(xml_content)
+    print(len(attack_patterns_pydantic.Capecs))
+
+    os.makedirs(os.path.dirname(capec_json), exist_ok=True)
+    with open(capec_json, 'w') as f:
+        f.write(attack_patterns_pydantic.model_dump_json(indent=2))
+    save_compact(attack_patterns_pydantic, compact_path(capec_json), capec_json)
+    return attack_patterns_pydantic
+
+def convert_cwe(cwe_xml, cwe_json):
+    """
+    Parses the CWE XML file and writes the CWE collection as readable JSON,
+    plus a compact artefact next to it.
+    """
+    print("Converting CWEs to JSON")
+    with open(cwe_xml, 'r', encoding='UTF-8') as file:
+        xml_content = file.read()
+
+    cwes_col = parse_cwe_xml(xml_content)
+
+    print(len(cwes_col.CWEs))
+
+    os.makedirs(os.path.dirname(cwe_json), exist_ok=True)
+    with open(cwe_json, 'w') as f:
+        f.write(cwes_col.model_dump_json(indent=2))
+    save_compact(cwes_col, compact_path(cwe_json), cwe_json)
+
+    i = 0
+    for k in cwes_col.CWEs:
+        status_to_be_removed = [CweStatusEnum.DEPRECATED, CweStatusEnum.OBSOLETE]
+        if (cwes_col.CWEs[k].Status in status_to_be_removed ):
+            i += 1
+    print("Elements to be removed ", i)
+    return cwes_col
+
+def save_capec_cwe_index(capec_collection, cwe_collection, index_json):
+    """
+    Builds the bidirectional CAPEC <-> CWE index and writes it as readable JSON,
+    plus a compact artefact next to it.
+    """
+    print("Building CAPEC <-> CWE index")
+    index = build_capec_cwe_index(capec_collection, cwe_collection)
+    print(len(index.Cwe_To_Capecs), "CWEs with related CAPECs,", len(index.Cwe_To_Capecs_Transitive), "including ChildOf descendants")
+
+    os.makedirs(os.path.dirname(index_json), exist_ok=True)
+    with open(index_json, 'w') as f:
+        f.write(index.model_dump_json(indent=2))
+    save_compact(index, compact_path(index_json), index_json)
+
+# Schemas of the cross-reference tables; the CWE columns are categoricals like the cwe column of cve_cwe.parquet
+CWE_ANCESTORS_SCHEMA = {"cwe": pl.Categorical, "ancestor": pl.Categorical, "depth": pl.Int16, "ancestor_abstraction": pl.Categorical}
+CWE_CAPEC_SCHEMA = {"cwe": pl.Categorical, "capec": pl.Categorical}
+
+def save_crossref_tables(capec_collection, cwe_collection, tables_dir):
+    """
+    Writes the CWE ancestor table (cwe_ancestors.parquet) and the CWE -> CAPEC edge table
+    (cwe_capec.parquet), so that hierarchy roll-ups are polars joins.
+    """
+    print("Building CWE ancestor and CWE -> CAPEC tables")
+    os.makedirs(tables_dir, exist_ok=True)
+    ancestors = pl.DataFrame(cwe_ancestor_rows(cwe_collection), schema=CWE_ANCESTORS_SCHEMA)
+    ancestors.write_parquet(os.path.join(tables_dir, "cwe_ancestors.parquet"))
+    edges = pl.DataFrame(cwe_capec_rows(capec_collection), schema=CWE_CAPEC_SCHEMA)
+    edges.write_parquet(os.path.join(tables_dir, "cwe_capec.parquet"))
+    print(ancestors.height, "CWE ancestor rows,", edges.height, "CWE -> CAPEC edges")
+
+def run_timed(func, *args):
+    """
+    Runs func(*args) and returns its result along with the elapsed wall time in seconds.
+    Used as the unit of work submitted to the installer process pool.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
 def main():
     parser = argparse.ArgumentParser(description="Convert CAPEC and CWE XML files to JSON and decompress CVEs.")
     parser.add_argument("--capec-xml", help="Path to CAPEC XML file.")
     parser.add_argument("--capec-json", help="Path to output CAPEC JSON file.")
     parser.add_argument("--cwe-xml", help="Path to CWE XML file.")
     parser.add_argument("--cwe-json", help="Path to output CWE JSON file.")
+    parser.add_argument("--capec-cwe-json", help="Path to output CAPEC <-> CWE index JSON file. Requires both the CAPEC and CWE conversions.")
+    parser.add_argument("--crossref-dir", help="Output directory for the CWE ancestor and CWE -> CAPEC Parquet tables. Requires both the CAPEC and CWE conversions.")
     parser.add_argument("--cve-download-dir", help="Input directory for compressed CVE JSON files (NVD). ")
     parser.add_argument("--cve-data-dir", help="Output directory for decompressed CVE JSON files (NVD). ")
     parser.add_argument("--github-cve-zip", help="Path to the downloaded GitHub CVE zip file.")
     parser.add_argument("--github-cve-output-dir", help="Output directory for unzipped GitHub CVE JSON files.")
     args = parser.parse_args()
 
+    # The conversions are independent of each other, so each one runs as its own task
+    tasks = []
     if args.capec_xml and args.capec_json:
-        print("Converting CAPECs to JSON")
-        file_path = args.capec_xml
-        with open(file_path, 'r', encoding='UTF-8') as file:
-            xml_content = file.read()
-
-        attack_patterns_pydantic = parse_capec_xml_pydantic(xml_content)
-        print(len(attack_patterns_pydantic.Capecs))
-
-        os.makedirs(os.path.dirname(args.capec_json), exist_ok=True)
-        with open(args.capec_json, 'w') as f:
-            f.write(attack_patterns_pydantic.model_dump_json(indent=2))
+        tasks.append(("CAPEC conversion", convert_capec, (args.capec_xml, args.capec_json)))
 
     if args.cwe_xml and args.cwe_json:
-        print("Converting CWEs to JSON")
-
-        cwe_path = args.cwe_xml
-        with open(cwe_path, 'r', encoding='UTF-8') as file:
-            xml_content = file.read()
-        
-        cwes_col = parse_cwe_xml(xml_content)
-
-        print(len(cwes_col.CWEs))
-
-        os.makedirs(os.path.dirname(args.cwe_json), exist_ok=True)
-        with open(args.cwe_json, 'w') as f:
-            f.write(cwes_col.model_dump_json(indent=2))
-
-        i = 0
-        for k in cwes_col.CWEs:
-            status_to_be_removed = [CweStatusEnum.DEPRECATED, CweStatusEnum.OBSOLETE]
-            if (cwes_col.CWEs[k].Status in status_to_be_removed ):
-                i += 1
-        print("Elements to be removed ", i)
+        tasks.append(("CWE conversion", convert_cwe, (args.cwe_xml, args.cwe_json)))
 
     if args.cve_download_dir and args.cve_data_dir:
-        print("Decompressing NVD CVEs")
-        decompress_cves(args.cve_download_dir, args.cve_data_dir)
+        tasks.append(("NVD CVE decompression", decompress_cves, (args.cve_download_dir, args.cve_data_dir)))
 
     if args.github_cve_zip and args.github_cve_output_dir:
-        print("Unzipping GitHub CVEs")
-        unzip_github_cves(args.github_cve_zip, args.github_cve_output_dir)
+        tasks.append(("GitHub CVE extraction", unzip_github_cves, (args.github_cve_zip, args.github_cve_output_dir)))
+
+    if not tasks:
+        print("Nothing to install.")
+        return
+
+    start = time.perf_counter()
+    task_timings = {}
+    task_results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {executor.submit(run_timed, func, *func_args): name for name, func, func_args in tasks}
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future]
+            result, elapsed = future.result()
+            task_results[name] = result
+            task_timings[name] = elapsed
+            print(f"{name} finished in {elapsed:.2f}s")
+
+    tasks_elapsed = time.perf_counter() - start
+
+    # The cross references need both collections, so they are built after the pool, as a step of their own
+    crossref_elapsed = 0.0
+    if "CAPEC conversion" in task_results and "CWE conversion" in task_results and (args.capec_cwe_json or args.crossref_dir):
+        crossref_start = time.perf_counter()
+        if args.capec_cwe_json:
+            save_capec_cwe_index(task_results["CAPEC conversion"], task_results["CWE conversion"], args.capec_cwe_json)
+        if args.crossref_dir:
+            save_crossref_tables(task_results["CAPEC conversion"], task_results["CWE conversion"], args.crossref_dir)
+        crossref_elapsed = time.perf_counter() - crossref_start
+        print(f"Cross references finished in {crossref_elapsed:.2f}s")
+    total = time.perf_counter() - start
+
+    slowest = max(task_timings, key=lambda k: task_timings[k])
+    print(f"Install finished in {total:.2f}s (tasks: {tasks_elapsed:.2f}s, slowest task: {slowest}, {task_timings[slowest]:.2f}s; "
+          f"cross references: {crossref_elapsed:.2f}s)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
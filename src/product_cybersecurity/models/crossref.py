@@ -0,0 +1,126 @@
+from pydantic import BaseModel
+from typing import Any, List, Dict, Set
+
+from product_cybersecurity.models.capecparser import CapecCollection
+from product_cybersecurity.models.cweparser import CweCollection, RelatedCweNatureEnum
+
+
+class CapecCweIndex(BaseModel):
+    """
+    Bidirectional CAPEC <-> CWE index.
+    The transitive maps also follow the CWE ChildOf hierarchy: an attack pattern related to a CWE
+    is related to every descendant of that CWE.
+    """
+    Cwe_To_Capecs: Dict[str, List[str]]
+    Capec_To_Cwes: Dict[str, List[str]]
+    Cwe_To_Capecs_Transitive: Dict[str, List[str]]
+    Capec_To_Cwes_Transitive: Dict[str, List[str]]
+
+    def capecs_for_cwe(self, cwe_id: str, transitive: bool = False) -> List[str]:
+        index = self.Cwe_To_Capecs_Transitive if transitive else self.Cwe_To_Capecs
+        return index.get(cwe_id, [])
+
+    def cwes_for_capec(self, capec_id: str, transitive: bool = False) -> List[str]:
+        index = self.Capec_To_Cwes_Transitive if transitive else self.Capec_To_Cwes
+        return index.get(capec_id, [])
+
+
+def _child_of_parents(cwe_collection: CweCollection) -> Dict[str, Set[str]]:
+    parents: Dict[str, Set[str]] = {}
+    for cwe in cwe_collection.CWEs.values():
+        parents[cwe.ID] = set()
+        if cwe.Related_CWEs:
+            for related_cwe in cwe.Related_CWEs:
+                if related_cwe.Nature == RelatedCweNatureEnum.CHILD_OF:
+                    parents[cwe.ID].add(related_cwe.CWE_ID)
+    return parents
+
+
+def cwe_ancestor_depths(cwe_collection: CweCollection) -> Dict[str, Dict[str, int]]:
+    """
+    Returns, for every CWE, its ChildOf ancestors (the CWE itself excluded) with their depth,
+    the length of the shortest ChildOf path to them: 1 for a parent, 2 for a grandparent...
+    """
+    parents = _child_of_parents(cwe_collection)
+    depths: Dict[str, Dict[str, int]] = {}
+    for cwe_id in parents:
+        ancestors: Dict[str, int] = {}
+        level = parents[cwe_id] - {cwe_id}
+        depth = 1
+        while level:
+            next_level: Set[str] = set()
+            for node in level:
+                ancestors[node] = depth
+                next_level.update(parents.get(node, ()))
+            level = next_level - ancestors.keys() - {cwe_id}
+            depth += 1
+        depths[cwe_id] = ancestors
+    return depths
+
+
+def cwe_ancestors(cwe_collection: CweCollection) -> Dict[str, Set[str]]:
+    """
+    Returns, for every CWE, the set of its ChildOf ancestors (the CWE itself excluded).
+    """
+    return {cwe_id: set(ancestors) for cwe_id, ancestors in cwe_ancestor_depths(cwe_collection).items()}
+
+
+def cwe_ancestor_rows(cwe_collection: CweCollection) -> List[Dict[str, Any]]:
+    """
+    Returns the rows of the CWE ancestor table: (cwe, ancestor, depth, ancestor_abstraction) for every
+    ChildOf ancestor, plus a depth 0 row for the CWE itself, so that rolling up a table of CWEs
+    to any level is a single join.
+    """
+    rows = []
+    for cwe_id, ancestors in cwe_ancestor_depths(cwe_collection).items():
+        for ancestor_id, depth in [(cwe_id, 0), *sorted(ancestors.items(), key=lambda item: (item[1], item[0]))]:
+            ancestor = cwe_collection.CWEs.get(ancestor_id)
+            rows.append({
+                "cwe": cwe_id,
+                "ancestor": ancestor_id,
+                "depth": depth,
+                "ancestor_abstraction": ancestor.Abstraction.value if ancestor else None,
+            })
+    return rows
+
+
+def cwe_capec_rows(capec_collection: CapecCollection) -> List[Dict[str, Any]]:
+    """
+    Returns the rows of the CWE -> CAPEC edge table: one (cwe, capec) row per CAPEC related weakness.
+    """
+    rows = []
+    for capec in capec_collection.Capecs.values():
+        for cwe_id in capec.Related_Weaknesses or ():
+            rows.append({"cwe": cwe_id, "capec": capec.ID})
+    return rows
+
+
+def _sorted_index(index: Dict[str, Set[str]]) -> Dict[str, List[str]]:
+    def id_number(entry_id: str) -> int:
+        return int(entry_id.split("-")[-1])
+    return {k: sorted(v, key=id_number) for k, v in sorted(index.items(), key=lambda item: id_number(item[0]))}
+
+
+def build_capec_cwe_index(capec_collection: CapecCollection, cwe_collection: CweCollection) -> CapecCweIndex:
+    cwe_to_capecs: Dict[str, Set[str]] = {}
+    capec_to_cwes: Dict[str, Set[str]] = {}
+    for capec in capec_collection.Capecs.values():
+        if capec.Related_Weaknesses:
+            for cwe_id in capec.Related_Weaknesses:
+                cwe_to_capecs.setdefault(cwe_id, set()).add(capec.ID)
+                capec_to_cwes.setdefault(capec.ID, set()).add(cwe_id)
+
+    cwe_to_capecs_transitive = {k: set(v) for k, v in cwe_to_capecs.items()}
+    capec_to_cwes_transitive = {k: set(v) for k, v in capec_to_cwes.items()}
+    for cwe_id, ancestors in cwe_ancestors(cwe_collection).items():
+        for related_id in ancestors:
+            for capec_id in cwe_to_capecs.get(related_id, ()):
+                cwe_to_capecs_transitive.setdefault(cwe_id, set()).add(capec_id)
+                capec_to_cwes_transitive.setdefault(capec_id, set()).add(cwe_id)
+
+    return CapecCweIndex(
+        Cwe_To_Capecs=_sorted_index(cwe_to_capecs),
+        Capec_To_Cwes=_sorted_index(capec_to_cwes),
+        Cwe_To_Capecs_Transitive=_sorted_index(cwe_to_capecs_transitive),
+        Capec_To_Cwes_Transitive=_sorted_index(capec_to_cwes_transitive),
+    )
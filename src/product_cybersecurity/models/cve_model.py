@@ -10,15 +10,19 @@ from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import (
     AnyUrl,
-    BaseModel,
     ConfigDict,
     Field,
-    RootModel,
     confloat,
     conint,
     constr,
 )
 
+# Deferred base classes: validators are built on first use instead of at import time
+from product_cybersecurity.models.deferred import BaseModel, RootModel
+
+# Constrained string types replacing the generated UuidType, Cpe22and23, Cpe23 and Timestamp RootModels
+from product_cybersecurity.models.cve_types import Cpe22and23, Cpe23, Timestamp, UuidType
+
 
 class UriType(RootModel[AnyUrl]):
     root: AnyUrl = Field(
@@ -27,21 +31,6 @@ class UriType(RootModel[AnyUrl]):
     )
 
 
-class UuidType(
-    RootModel[
-        constr(
-            pattern=r'^[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-4[0-9A-Fa-f]{3}-[89ABab][0-9A-Fa-f]{3}-[0-9A-Fa-f]{12}$'
-        )
-    ]
-):
-    root: constr(
-        pattern=r'^[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-4[0-9A-Fa-f]{3}-[89ABab][0-9A-Fa-f]{3}-[0-9A-Fa-f]{12}$'
-    ) = Field(
-        ...,
-        description='A version 4 (random) universally unique identifier (UUID) as defined by [RFC 4122](https://tools.ietf.org/html/rfc4122#section-4.1.3).',
-    )
-
-
 class Tags(Enum):
     broken_link = 'broken-link'
     customer_entitlement = 'customer-entitlement'
@@ -68,40 +57,6 @@ class CveId(RootModel[constr(pattern=r'^CVE-[0-9]{4}-[0-9]{4,19}$')]):
     root: constr(pattern=r'^CVE-[0-9]{4}-[0-9]{4,19}$')
 
 
-class Cpe22and23(
-    RootModel[
-        constr(
-            pattern=r'([c][pP][eE]:/[AHOaho]?(:[A-Za-z0-9._\-~%]*){0,6})|(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})',
-            min_length=1,
-            max_length=2048,
-        )
-    ]
-):
-    root: constr(
-        pattern=r'([c][pP][eE]:/[AHOaho]?(:[A-Za-z0-9._\-~%]*){0,6})|(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})',
-        min_length=1,
-        max_length=2048,
-    ) = Field(
-        ...,
-        description='Common Platform Enumeration (CPE) Name in either 2.2 or 2.3 format',
-    )
-
-
-class Cpe23(
-    RootModel[
-        constr(
-            pattern=r'(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})',
-            min_length=1,
-            max_length=2048,
-        )
-    ]
-):
-    root: constr(
-        pattern=r'(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})',
-        min_length=1,
-        max_length=2048,
-    ) = Field(..., description='Common Platform Enumeration (CPE) Name in 2.3 format')
-
 
 class OrgId(RootModel[UuidType]):
     root: UuidType = Field(
@@ -130,21 +85,6 @@ class Datestamp(RootModel[date]):
     )
 
 
-class Timestamp(
-    RootModel[
-        constr(
-            pattern=r'^(((2000|2400|2800|(19|2[0-9](0[48]|[2468][048]|[13579][26])))-02-29)|(((19|2[0-9])[0-9]{2})-02-(0[1-9]|1[0-9]|2[0-8]))|(((19|2[0-9])[0-9]{2})-(0[13578]|10|12)-(0[1-9]|[12][0-9]|3[01]))|(((19|2[0-9])[0-9]{2})-(0[469]|11)-(0[1-9]|[12][0-9]|30)))T(2[0-3]|[01][0-9]):([0-5][0-9]):([0-5][0-9])(\.[0-9]+)?(Z|[+-][0-9]{2}:[0-9]{2})?$'
-        )
-    ]
-):
-    root: constr(
-        pattern=r'^(((2000|2400|2800|(19|2[0-9](0[48]|[2468][048]|[13579][26])))-02-29)|(((19|2[0-9])[0-9]{2})-02-(0[1-9]|1[0-9]|2[0-8]))|(((19|2[0-9])[0-9]{2})-(0[13578]|10|12)-(0[1-9]|[12][0-9]|3[01]))|(((19|2[0-9])[0-9]{2})-(0[469]|11)-(0[1-9]|[12][0-9]|30)))T(2[0-3]|[01][0-9]):([0-5][0-9]):([0-5][0-9])(\.[0-9]+)?(Z|[+-][0-9]{2}:[0-9]{2})?$'
-    ) = Field(
-        ...,
-        description="Date/time format based on RFC3339 and ISO ISO8601, with an optional timezone in the format 'yyyy-MM-ddTHH:mm:ss[+-]ZH:ZM'. If timezone offset is not given, GMT (+00:00) is assumed.",
-    )
-
-
 class Version(RootModel[constr(min_length=1, max_length=1024)]):
     root: constr(min_length=1, max_length=1024) = Field(
         ...,
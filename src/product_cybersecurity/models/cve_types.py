@@ -0,0 +1,44 @@
+from typing import Annotated
+
+from pydantic import Field, StringConstraints
+
+# Hot string types of the CVE record format, declared as constrained strings instead of the
+# RootModel classes generated by datamodel-codegen. The pattern check itself runs in
+# pydantic-core and is cheap, wrapping every CPE, timestamp and UUID in a RootModel instance
+# is what dominates validation of records carrying thousands of CPEs.
+# Patterns and length limits are copied verbatim from the CVE JSON schema.
+
+UUID_PATTERN = r'^[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-4[0-9A-Fa-f]{3}-[89ABab][0-9A-Fa-f]{3}-[0-9A-Fa-f]{12}$'
+
+CPE23_PATTERN = r'(cpe:2\.3:[aho*\-](:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){5}(:(([a-zA-Z]{2,3}(-([a-zA-Z]{2}|[0-9]{3}))?)|[*\-]))(:(((\?*|\*?)([a-zA-Z0-9\-._]|(\\[\\*?!"#$%&\'()+,/:;<=>@\[\]\^`{|}~]))+(\?*|\*?))|[*\-])){4})'
+
+CPE22_AND_23_PATTERN = r'([c][pP][eE]:/[AHOaho]?(:[A-Za-z0-9._\-~%]*){0,6})|' + CPE23_PATTERN
+
+TIMESTAMP_PATTERN = r'^(((2000|2400|2800|(19|2[0-9](0[48]|[2468][048]|[13579][26])))-02-29)|(((19|2[0-9])[0-9]{2})-02-(0[1-9]|1[0-9]|2[0-8]))|(((19|2[0-9])[0-9]{2})-(0[13578]|10|12)-(0[1-9]|[12][0-9]|3[01]))|(((19|2[0-9])[0-9]{2})-(0[469]|11)-(0[1-9]|[12][0-9]|30)))T(2[0-3]|[01][0-9]):([0-5][0-9]):([0-5][0-9])(\.[0-9]+)?(Z|[+-][0-9]{2}:[0-9]{2})?$'
+
+CPE_MIN_LENGTH = 1
+CPE_MAX_LENGTH = 2048
+
+UuidType = Annotated[
+    str,
+    StringConstraints(pattern=UUID_PATTERN),
+    Field(description='A version 4 (random) universally unique identifier (UUID) as defined by [RFC 4122](https://tools.ietf.org/html/rfc4122#section-4.1.3).'),
+]
+
+Cpe22and23 = Annotated[
+    str,
+    StringConstraints(pattern=CPE22_AND_23_PATTERN, min_length=CPE_MIN_LENGTH, max_length=CPE_MAX_LENGTH),
+    Field(description='Common Platform Enumeration (CPE) Name in either 2.2 or 2.3 format'),
+]
+
+Cpe23 = Annotated[
+    str,
+    StringConstraints(pattern=CPE23_PATTERN, min_length=CPE_MIN_LENGTH, max_length=CPE_MAX_LENGTH),
+    Field(description='Common Platform Enumeration (CPE) Name in 2.3 format'),
+]
+
+Timestamp = Annotated[
+    str,
+    StringConstraints(pattern=TIMESTAMP_PATTERN),
+    Field(description="Date/time format based on RFC3339 and ISO ISO8601, with an optional timezone in the format 'yyyy-MM-ddTHH:mm:ss[+-]ZH:ZM'. If timezone offset is not given, GMT (+00:00) is assumed."),
+]
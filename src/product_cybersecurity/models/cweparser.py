@@ -71,9 +71,15 @@ class CweStatusEnum(str, Enum):
     STABLE = "Stable"
     USABLE = "Usable"
 
+class CweViewTypeEnum(str, Enum):
+    GRAPH = "Graph"
+    EXPLICIT = "Explicit"
+    IMPLICIT = "Implicit"
+
 class RelatedCWE(BaseModel):
     CWE_ID: str
     Nature: RelatedCweNatureEnum
+    View_ID: Optional[str] = None
 
 class Cwe(BaseModel):
     """
@@ -97,8 +103,92 @@ class Cwe(BaseModel):
     # Execution_Flow: Optional[List[dict]]  # TODO define a more detailed model for Execution Flow if needed
 
 
+class CweMember(BaseModel):
+    CWE_ID: str
+    View_ID: Optional[str]
+
+class CweCategory(BaseModel):
+    """
+    CWE Category, an informal grouping of weaknesses
+    """
+    ID: str
+    Name: str
+    Number: int
+    Status: CweStatusEnum
+    Summary: str
+    Members: List[CweMember]
+
+class CweView(BaseModel):
+    """
+    CWE View (e.g. Research Concepts CWE-1000, Software Development CWE-699, Top 25 lists)
+    """
+    ID: str
+    Name: str
+    Number: int
+    Type: CweViewTypeEnum
+    Status: CweStatusEnum
+    Objective: str
+    Members: List[CweMember]
+
+class CweMembership(BaseModel):
+    """
+    Categories and views an entry belongs to
+    """
+    Categories: List[str]
+    Views: List[str]
+
 class CweCollection(BaseModel):
     CWEs : Dict[str, Cwe]
+    Categories : Dict[str, CweCategory] = {}
+    Views : Dict[str, CweView] = {}
+    Memberships : Dict[str, CweMembership] = {}
+
+
+def build_membership_index(cwe_dict: Dict[str, Cwe], categories: Dict[str, CweCategory], views: Dict[str, CweView]) -> Dict[str, CweMembership]:
+    """
+    Builds the CWE id -> categories/views index.
+    An entry belongs to a view when the view lists it as a member, when one of its relationships
+    is scoped to that view, or when a category lists it as a member of that view.
+    Implicit views are defined by an XPath filter and only contribute their explicit members.
+    """
+    # dicts are used as ordered sets
+    member_categories: Dict[str, Dict[str, None]] = {}
+    member_views: Dict[str, Dict[str, None]] = {}
+
+    for view in views.values():
+        for member in view.Members:
+            member_views.setdefault(member.CWE_ID, {})[view.ID] = None
+
+    for cwe in cwe_dict.values():
+        if cwe.Related_CWEs:
+            for related_cwe in cwe.Related_CWEs:
+                if related_cwe.View_ID in views:
+                    member_views.setdefault(cwe.ID, {})[related_cwe.View_ID] = None
+
+    for category in categories.values():
+        for member in category.Members:
+            member_categories.setdefault(member.CWE_ID, {})[category.ID] = None
+            if member.View_ID in views:
+                member_views.setdefault(member.CWE_ID, {})[member.View_ID] = None
+
+    memberships: Dict[str, CweMembership] = {}
+    for cwe_id in member_categories.keys() | member_views.keys():
+        memberships[cwe_id] = CweMembership(
+            Categories=list(member_categories.get(cwe_id, {})),
+            Views=list(member_views.get(cwe_id, {})),
+        )
+    return dict(sorted(memberships.items(), key=lambda item: int(item[0].removeprefix("CWE-"))))
+
+
+def parse_cwe_members(element, path: str, ns) -> List[CweMember]:
+    """
+    Parses the Has_Member entries of a category or a view.
+    """
+    members = []
+    for member in element.findall(path, ns):
+        view_id = member.get("View_ID")
+        members.append(CweMember(CWE_ID="CWE-" + member.get("CWE_ID"), View_ID="CWE-" + view_id if view_id else None))
+    return members
 
 
 def parse_cwe_xml(xml_content) -> CweCollection:
@@ -137,7 +227,8 @@ def parse_cwe_xml(xml_content) -> CweCollection:
         # Process Related Attack Patterns
         related_CWEs = []
         for related in cwe.findall(".//cwe:Related_Weaknesses/cwe:Related_Weakness", ns):
-            related_c = RelatedCWE(CWE_ID="CWE-" + related.get("CWE_ID"), Nature=related.get("Nature"))
+            view_id = related.get("View_ID")
+            related_c = RelatedCWE(CWE_ID="CWE-" + related.get("CWE_ID"), Nature=related.get("Nature"), View_ID="CWE-" + view_id if view_id else None)
             related_CWEs.append(related_c)
         if related_CWEs:
             cwe_details["Related_CWEs"] = related_CWEs
@@ -146,6 +237,33 @@ def parse_cwe_xml(xml_content) -> CweCollection:
         
         # add the details into the cwe_dict
         cwe_dict[cwe_details["ID"]] = cwe_details
-    cwecol = CweCollection(CWEs=cwe_dict)
+
+    categories = {}
+    for category in root.findall(".//cwe:Category", ns):
+        category_id = "CWE-" + category.get("ID")
+        categories[category_id] = CweCategory(
+            ID=category_id,
+            Name=category.get("Name"),
+            Number=category.get("ID"),
+            Status=category.get("Status"),
+            Summary=extract_description_with_html(category.find("cwe:Summary", ns), ns),
+            Members=parse_cwe_members(category, "cwe:Relationships/cwe:Has_Member", ns),
+        )
+
+    views = {}
+    for view in root.findall(".//cwe:View", ns):
+        view_id = "CWE-" + view.get("ID")
+        views[view_id] = CweView(
+            ID=view_id,
+            Name=view.get("Name"),
+            Number=view.get("ID"),
+            Type=view.get("Type"),
+            Status=view.get("Status"),
+            Objective=extract_description_with_html(view.find("cwe:Objective", ns), ns),
+            Members=parse_cwe_members(view, "cwe:Members/cwe:Has_Member", ns),
+        )
+
+    cwecol = CweCollection(CWEs=cwe_dict, Categories=categories, Views=views)
+    cwecol.Memberships = build_membership_index(cwecol.CWEs, cwecol.Categories, cwecol.Views)
 
     return cwecol
@@ -0,0 +1,30 @@
+from typing import Generic
+
+import pydantic
+from pydantic import ConfigDict
+from pydantic.root_model import RootModelRootType
+
+
+class BaseModel(pydantic.BaseModel):
+    """
+    BaseModel whose validator is only built on first use.
+    The generated CVE model declares over 300 classes, building all their schemas at import
+    time dominates the startup of any script importing it.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+class RootModel(pydantic.RootModel[RootModelRootType], Generic[RootModelRootType]):
+    """
+    RootModel counterpart of the deferred BaseModel.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+def build_deferred_model(model_cls: type[pydantic.BaseModel]) -> None:
+    """
+    Builds the validator of a deferred model now rather than on first validation.
+    Calling it in a parent process before forking workers lets them inherit the built validator.
+    """
+    if not model_cls.__pydantic_complete__:
+        model_cls.model_rebuild()
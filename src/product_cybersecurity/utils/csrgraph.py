@@ -0,0 +1,209 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+from product_cybersecurity.models.capecparser import CapecCollection
+from product_cybersecurity.models.cweparser import CweCollection
+
+# Nature of the CAPEC -> CWE edges built from the Related_Weaknesses of the attack patterns
+RELATED_WEAKNESS = "RelatedWeakness"
+
+
+class CsrGraph:
+    """
+    Directed graph of CWE and CAPEC relations stored as NumPy CSR arrays: the targets of the edges of
+    node i are indices[indptr[i]:indptr[i + 1]], with the nature of every edge as a code into
+    natures. Nodes are integers, ids maps them to their string ids and back with index.
+
+    Traversals work on whole frontiers or node sets at once instead of node by node, and the
+    relations of one nature are selected with relation. Use to_networkx for export.
+    """
+
+    def __init__(self, ids: Sequence[str], indptr: np.ndarray, indices: np.ndarray, edge_natures: np.ndarray, natures: Sequence[str]):
+        self.ids: List[str] = list(ids)
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_natures = edge_natures
+        self.natures: List[str] = list(natures)
+        # Source of every edge, so edge-wise operations do not have to walk indptr
+        self.sources = np.repeat(np.arange(len(self.ids), dtype=np.int32), np.diff(indptr))
+
+    @classmethod
+    def from_edges(cls, ids: Iterable[str], edges: Iterable[Tuple[str, str, str]]) -> "CsrGraph":
+        """
+        Builds the graph from (source, target, nature) triples. Duplicate edges are dropped and
+        edge ends missing from ids are added as nodes.
+        """
+        ids = list(dict.fromkeys(ids))
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        natures: Dict[str, int] = {}
+        triples = set()
+        for source, target, nature in edges:
+            for node_id in (source, target):
+                if node_id not in index:
+                    index[node_id] = len(ids)
+                    ids.append(node_id)
+            triples.add((index[source], index[target], natures.setdefault(nature, len(natures))))
+
+        edge_array = np.array(sorted(triples), dtype=np.int32).reshape(-1, 3)
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_array[:, 0], minlength=len(ids)), out=indptr[1:])
+        return cls(ids, indptr, edge_array[:, 1].copy(), edge_array[:, 2].astype(np.int8), list(natures))
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def nodes(self, node_ids: Iterable[str]) -> np.ndarray:
+        return np.array([self.index[node_id] for node_id in node_ids], dtype=np.int32)
+
+    def node_ids(self, nodes: Iterable[int]) -> List[str]:
+        return [self.ids[node] for node in nodes]
+
+    def successors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.node_count)
+
+    def _with_edges(self, keep: np.ndarray, reverse: bool = False) -> "CsrGraph":
+        sources, targets = (self.indices[keep], self.sources[keep]) if reverse else (self.sources[keep], self.indices[keep])
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.node_count), out=indptr[1:])
+        return CsrGraph(self.ids, indptr, targets[order], self.edge_natures[keep][order], self.natures)
+
+    def relation(self, *natures: str) -> "CsrGraph":
+        """
+        Returns the graph restricted to the edges of the given natures, on the same nodes.
+        """
+        codes = [self.natures.index(nature) for nature in natures if nature in self.natures]
+        return self._with_edges(np.isin(self.edge_natures, codes))
+
+    def reverse(self) -> "CsrGraph":
+        return self._with_edges(np.ones(self.edge_count, dtype=bool), reverse=True)
+
+    def step(self, frontier: np.ndarray) -> np.ndarray:
+        """
+        Returns the mask of the successors of the nodes of the boolean mask frontier.
+        """
+        reached = np.zeros(self.node_count, dtype=bool)
+        reached[self.indices[frontier[self.sources]]] = True
+        return reached
+
+    def distances(self, starts: Iterable[int]) -> np.ndarray:
+        """
+        Returns the number of edges on the shortest path from any of starts to every node,
+        -1 for the nodes that cannot be reached, one frontier at a time.
+        """
+        distance = np.full(self.node_count, -1, dtype=np.int32)
+        frontier = np.zeros(self.node_count, dtype=bool)
+        frontier[np.fromiter(starts, dtype=np.int32)] = True
+        level = 0
+        while frontier.any():
+            distance[frontier] = level
+            frontier = self.step(frontier) & (distance < 0)
+            level += 1
+        return distance
+
+    def reachable(self, starts: Iterable[int]) -> np.ndarray:
+        """
+        Returns the mask of the nodes reachable from any of starts, starts included.
+        """
+        return self.distances(starts) >= 0
+
+    def depths(self) -> np.ndarray:
+        """
+        Returns the length of the longest path from every node to a node without successors,
+        e.g. the depth of every CWE under the pillars for ChildOf edges. Raises ValueError on a cycle.
+        """
+        depth = np.zeros(self.node_count, dtype=np.int32)
+        remaining = self.out_degree().copy()
+        done = np.zeros(self.node_count, dtype=bool)
+        reverse = self.reverse()
+        # Peel the graph from the sinks, a whole layer per iteration
+        layer = remaining == 0
+        level = 0
+        while layer.any():
+            depth[layer] = level
+            done |= layer
+            np.subtract.at(remaining, reverse.indices[layer[reverse.sources]], 1)
+            layer = (remaining == 0) & ~done
+            level += 1
+        if not done.all():
+            raise ValueError("depths are only defined on acyclic graphs")
+        return depth
+
+    def closure(self) -> np.ndarray:
+        """
+        Returns the reachability of every node as a bit-packed matrix (np.packbits rows): row i
+        holds the nodes reachable from node i, i included. Computed by OR-ing the rows of the
+        successors into every node until a fixpoint, which also terminates on cyclic relations.
+        Each pass only recomputes the nodes with a successor that changed in the previous one.
+        """
+        reach = np.packbits(np.eye(self.node_count, dtype=bool), axis=1)
+        changed = np.ones(self.node_count, dtype=bool)
+        while True:
+            active = np.zeros(self.node_count, dtype=bool)
+            active[self.sources[changed[self.indices]]] = True
+            nodes = np.flatnonzero(active)
+            if not len(nodes):
+                return reach
+            # The edges of the active nodes, in CSR order, form one non-empty segment per node
+            edges = active[self.sources]
+            starts = np.concatenate(([0], np.cumsum(self.out_degree()[nodes])[:-1]))
+            updated = reach[nodes] | np.bitwise_or.reduceat(reach[self.indices[edges]], starts, axis=0)
+            changed = np.zeros(self.node_count, dtype=bool)
+            changed[nodes] = (updated != reach[nodes]).any(axis=1)
+            reach[nodes] = updated
+
+    def closure_sizes(self, closure: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the number of nodes reachable from every node, itself included.
+        """
+        closure = self.closure() if closure is None else closure
+        return np.unpackbits(closure, axis=1, count=self.node_count).sum(axis=1)
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Returns the graph as a networkx DiGraph with a nature attribute on every edge. Edges of several
+        natures between the same nodes keep the last one.
+        """
+        graph: nx.DiGraph = nx.DiGraph()
+        graph.add_nodes_from(self.ids)
+        graph.add_edges_from(
+            (self.ids[source], self.ids[target], {"nature": self.natures[nature]})
+            for source, target, nature in zip(self.sources.tolist(), self.indices.tolist(), self.edge_natures.tolist())
+        )
+        return graph
+
+
+def security_csr_graph(cwe_collection: Optional[CweCollection] = None, capec_collection: Optional[CapecCollection] = None) -> CsrGraph:
+    """
+    Returns the relations of the CWEs and CAPECs of the collections given, of all natures: the
+    Related_CWEs of the CWEs, the Related_Attack_Patterns of the CAPECs and their Related_Weaknesses.
+    """
+    ids: List[str] = []
+    edges: List[Tuple[str, str, str]] = []
+    if cwe_collection is not None:
+        for cwe in cwe_collection.CWEs.values():
+            ids.append(cwe.ID)
+            for related_cwe in cwe.Related_CWEs or []:
+                edges.append((cwe.ID, related_cwe.CWE_ID, related_cwe.Nature.value))
+    if capec_collection is not None:
+        for capec in capec_collection.Capecs.values():
+            ids.append(capec.ID)
+            for related_ap in capec.Related_Attack_Patterns or []:
+                edges.append((capec.ID, related_ap.CAPEC_ID, related_ap.Nature.value))
+            for cwe_id in capec.Related_Weaknesses or []:
+                edges.append((capec.ID, cwe_id, RELATED_WEAKNESS))
+    return CsrGraph.from_edges(ids, edges)
@@ -0,0 +1,75 @@
+from typing import Dict, Iterable, Tuple
+
+import polars as pl
+
+from product_cybersecurity.utils.graphutils import Closure
+
+
+def descendant_pairs(descendants: Closure) -> pl.DataFrame:
+    """
+    Returns the (cwe, ancestor) pairs of a ChildOf closure, including a (cwe, cwe) pair for every
+    CWE, so that joining on cwe and grouping by ancestor rolls values up the hierarchy.
+    """
+    cwes = []
+    ancestors = []
+    for ancestor in descendants:
+        members = descendants[ancestor]
+        cwes.extend(members)
+        ancestors.extend([ancestor] * len(members))
+    return pl.DataFrame({"cwe": cwes, "ancestor": ancestors}, schema={"cwe": pl.String, "ancestor": pl.String})
+
+
+def cwe_cve_counts(cve_cwe: pl.DataFrame, descendants: Closure) -> pl.DataFrame:
+    """
+    Returns, for every CWE of the closure, its number of distinct CVEs: cve_direct for the CVEs
+    mapped to the CWE itself, cve_cumulative for those mapped to the CWE or any of its descendants.
+    A CVE mapped to several descendants of a CWE is counted once.
+    """
+    cve_cwe = cve_cwe.select("cve_id", pl.col("cwe").cast(pl.String)).unique()
+    direct = cve_cwe.group_by("cwe").agg(pl.col("cve_id").n_unique().alias("cve_direct"))
+    cumulative = (
+        cve_cwe.join(descendant_pairs(descendants), on="cwe")
+        .group_by("ancestor")
+        .agg(pl.col("cve_id").n_unique().alias("cve_cumulative"))
+        .rename({"ancestor": "cwe"})
+    )
+    return (
+        pl.DataFrame({"cwe": list(descendants)}, schema={"cwe": pl.String})
+        .join(direct, on="cwe", how="left")
+        .join(cumulative, on="cwe", how="left")
+        .fill_null(0)
+    )
+
+
+def capec_cve_counts(cve_cwe: pl.DataFrame, descendants: Closure, related_weaknesses: Iterable[Tuple[str, str]]) -> pl.DataFrame:
+    """
+    Returns, for every CAPEC with related weaknesses given as (capec, cwe) pairs, its number of
+    distinct CVEs: cve_direct for the CVEs mapped to its related CWEs, cve_cumulative for those
+    mapped to its related CWEs or any of their descendants.
+    """
+    capec_cwe = pl.DataFrame(list(related_weaknesses), schema={"capec": pl.String, "cwe": pl.String}, orient="row").unique()
+    cve_cwe = cve_cwe.select("cve_id", pl.col("cwe").cast(pl.String)).unique()
+    direct = (
+        cve_cwe.join(capec_cwe, on="cwe")
+        .group_by("capec")
+        .agg(pl.col("cve_id").n_unique().alias("cve_direct"))
+    )
+    cumulative = (
+        cve_cwe.join(descendant_pairs(descendants), on="cwe")
+        .join(capec_cwe, left_on="ancestor", right_on="cwe")
+        .group_by("capec")
+        .agg(pl.col("cve_id").n_unique().alias("cve_cumulative"))
+    )
+    return (
+        capec_cwe.select("capec").unique()
+        .join(direct, on="capec", how="left")
+        .join(cumulative, on="capec", how="left")
+        .fill_null(0)
+    )
+
+
+def count_map(counts: pl.DataFrame, key: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Returns the (cve_direct, cve_cumulative) counts of a counts table by its key column.
+    """
+    return {row[0]: (row[1], row[2]) for row in counts.select(key, "cve_direct", "cve_cumulative").iter_rows()}
@@ -0,0 +1,192 @@
+import math
+from typing import Dict, FrozenSet, Hashable, Iterable, Iterator, List, Mapping, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+def undirected_reachability(graph: nx.DiGraph) -> Dict[Hashable, Set[Hashable]]:
+    """
+    Returns, for every node, the set of nodes reachable from it when edge directions are ignored,
+    i.e. its weakly connected component. The components are computed in a single traversal and
+    all the nodes of a component share the same set, which callers must not modify.
+    """
+    reachable: Dict[Hashable, Set[Hashable]] = {}
+    for component in nx.weakly_connected_components(graph):
+        for node in component:
+            reachable[node] = component
+    return reachable
+
+
+def ordered_subgraph(graph: nx.DiGraph, nodes: Iterable[Hashable]) -> nx.DiGraph:
+    """
+    Returns a copy of the subgraph of graph induced by nodes, with its nodes and edges in graph order.
+    graph.subgraph iterates small node sets in set order, which changes from one run to the next with
+    string hashing, and so would the files written from it.
+    """
+    nodes = set(nodes)
+    subgraph = graph.__class__()
+    subgraph.graph.update(graph.graph)
+    subgraph.add_nodes_from((node, attributes) for node, attributes in graph.nodes(data=True) if node in nodes)
+    subgraph.add_edges_from((node, neighbour, attributes) for node in subgraph for neighbour, attributes in graph.adj[node].items() if neighbour in nodes)
+    return subgraph
+
+
+class Closure(Mapping[Hashable, FrozenSet[Hashable]]):
+    """
+    Maps every node of a directed graph to the set of nodes that have a path to it, the node itself
+    included (with ChildOf edges pointing from child to parent, the node and all its descendants).
+
+    The closure is computed in one dynamic programming pass in topological order: the set of a node
+    is the union of the sets of its predecessors plus the node itself. Cyclic relations are handled
+    by running the pass over the condensation of the graph instead, every node of a cycle then gets
+    the same set. Sets are kept as bitsets (Python ints over the node order) and only turned into
+    frozensets when looked up.
+    """
+
+    def __init__(self, graph: nx.DiGraph):
+        self._nodes: List[Hashable] = list(graph.nodes)
+        self._bits = {node: 1 << i for i, node in enumerate(self._nodes)}
+        try:
+            self._masks = self._dag_masks(graph, self._bits)
+        except nx.NetworkXUnfeasible:
+            self._masks = self._condensed_masks(graph, self._bits)
+        self._sets: Dict[Hashable, FrozenSet[Hashable]] = {}
+
+    @staticmethod
+    def _dag_masks(graph: nx.DiGraph, bit: Dict[Hashable, int]) -> Dict[Hashable, int]:
+        masks: Dict[Hashable, int] = {}
+        # topological_sort raises NetworkXUnfeasible as soon as it meets a cycle
+        for node in nx.topological_sort(graph):
+            mask = bit[node]
+            for predecessor in graph.predecessors(node):
+                mask |= masks[predecessor]
+            masks[node] = mask
+        return masks
+
+    @staticmethod
+    def _condensed_masks(graph: nx.DiGraph, bit: Dict[Hashable, int]) -> Dict[Hashable, int]:
+        condensed = nx.condensation(graph)
+        component_masks: Dict[int, int] = {}
+        for component in nx.topological_sort(condensed):
+            mask = 0
+            for member in condensed.nodes[component]["members"]:
+                mask |= bit[member]
+            for predecessor in condensed.predecessors(component):
+                mask |= component_masks[predecessor]
+            component_masks[component] = mask
+        return {node: component_masks[component] for node, component in condensed.graph["mapping"].items()}
+
+    def __getitem__(self, node: Hashable) -> FrozenSet[Hashable]:
+        if node not in self._sets:
+            self._sets[node] = frozenset(self._decode(self._masks[node]))
+        return self._sets[node]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._masks)
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def size(self, node: Hashable) -> int:
+        """
+        Returns the size of the set of node without building it.
+        """
+        return self._masks[node].bit_count()
+
+    def mask(self, nodes: Iterable[Hashable]) -> int:
+        """
+        Returns the bitset of nodes, to count the members of sets within them with count.
+        """
+        mask = 0
+        for node in nodes:
+            mask |= self._bits[node]
+        return mask
+
+    def count(self, node: Hashable, mask: int) -> int:
+        """
+        Returns the number of members of the set of node within the bitset mask.
+        """
+        return (self._masks[node] & mask).bit_count()
+
+    def _decode(self, mask: int) -> Iterator[Hashable]:
+        while mask:
+            lowest = mask & -mask
+            yield self._nodes[lowest.bit_length() - 1]
+            mask ^= lowest
+
+
+def predecessor_closure(graph: nx.DiGraph) -> Closure:
+    """
+    Returns, for every node, the set of nodes that have a path to it, the node itself included.
+    """
+    return Closure(graph)
+
+
+def successor_closure(graph: nx.DiGraph) -> Closure:
+    """
+    Returns, for every node, the set of nodes reachable from it, the node itself included.
+    """
+    return Closure(graph.reverse(copy=False))
+
+
+def force_layout(
+    graph: nx.Graph,
+    link_distance: float = 100.0,
+    charge: float = -400.0,
+    gravity: float = 0.1,
+    velocity_decay: float = 0.4,
+    iterations: int = 300,
+) -> Dict[Hashable, Tuple[float, float]]:
+    """
+    Returns x/y coordinates for every node, centred on 0, from a force simulation with the forces
+    of the d3 visualiser (link springs, many-body repulsion and x/y gravity), so the visualiser can
+    start from them and only refine. Each iteration is vectorised over all node pairs, the
+    repulsion being computed exactly rather than approximated like d3 does. Deterministic: the
+    nodes start on the d3 phyllotaxis spiral, in graph order.
+    """
+    nodes = list(graph.nodes)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges if u != v], dtype=np.intp).reshape(-1, 2)
+    source, target = edges[:, 0], edges[:, 1]
+
+    # Link strength and bias as in d3.forceLink: weaker springs on highly connected nodes,
+    # whose displacement is shared with their neighbours by degree
+    degree = np.bincount(edges.ravel(), minlength=n).astype(float)
+    strength = 1.0 / np.maximum(np.minimum(degree[source], degree[target]), 1.0)
+    bias = degree[source] / np.maximum(degree[source] + degree[target], 1.0)
+
+    i = np.arange(n) + 0.5
+    angle = i * math.pi * (3 - math.sqrt(5))
+    position = np.column_stack((10 * np.sqrt(i) * np.cos(angle), 10 * np.sqrt(i) * np.sin(angle)))
+    velocity = np.zeros_like(position)
+
+    alpha = 1.0
+    alpha_decay = 1 - 0.001 ** (1 / iterations)
+    for _ in range(iterations):
+        alpha += -alpha * alpha_decay
+
+        delta = position[target] + velocity[target] - position[source] - velocity[source]
+        length = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-6)
+        delta *= ((length - link_distance) / length * alpha * strength)[:, None]
+        np.subtract.at(velocity, target, delta * bias[:, None])
+        np.add.at(velocity, source, delta * (1 - bias)[:, None])
+
+        # sum over j of (p_j - p_i) / |p_j - p_i|^2, written as matrix products over the n x n
+        # inverse squared distances so no n x n x 2 offsets are materialised
+        squared = (position ** 2).sum(axis=1)
+        inverse = squared[:, None] + squared[None, :] - 2 * position @ position.T
+        np.maximum(inverse, 1.0, out=inverse)
+        np.reciprocal(inverse, out=inverse)
+        np.fill_diagonal(inverse, 0.0)
+        velocity += charge * alpha * (inverse @ position - position * inverse.sum(axis=1)[:, None])
+
+        velocity -= position * gravity * alpha
+        velocity *= 1 - velocity_decay
+        position += velocity
+        position -= position.mean(axis=0)
+
+    return {node: (float(x), float(y)) for node, (x, y) in zip(nodes, position)}
@@ -0,0 +1,44 @@
+import json
+from typing import Any, Callable, Dict
+
+import pydantic_core
+
+JsonLoads = Callable[[bytes], Any]
+
+
+def _orjson_loads() -> JsonLoads:
+    import orjson  # optional dependency
+    return orjson.loads
+
+
+# Backends decoding raw JSON bytes into Python objects, used when records are not validated
+# against the CVE model. pydantic-core is always installed alongside pydantic.
+JSON_BACKENDS: Dict[str, Callable[[], JsonLoads]] = {
+    "pydantic-core": lambda: pydantic_core.from_json,
+    "orjson": _orjson_loads,
+    "json": lambda: json.loads,
+}
+
+
+def get_json_loads(backend: str) -> JsonLoads:
+    """
+    Returns the loads function of a JSON backend.
+    Raises ValueError for an unknown backend and ImportError when its package is not installed.
+    """
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend}, expected one of {', '.join(JSON_BACKENDS)}")
+    return JSON_BACKENDS[backend]()
+
+
+def available_json_backends() -> list[str]:
+    """
+    Returns the JSON backends that can be imported in this environment.
+    """
+    available = []
+    for backend in JSON_BACKENDS:
+        try:
+            get_json_loads(backend)
+        except ImportError:
+            continue
+        available.append(backend)
+    return available
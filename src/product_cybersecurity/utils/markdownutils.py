@@ -1,15 +1,32 @@
 import datetime
 
-def get_markdown_frontmatter(title: str, draft: bool = False) -> list[str]:
+def get_markdown_frontmatter(title: str, draft: bool = False, unlisted: bool = False) -> list[str]:
     """
     Returns a list of strings representing the markdown frontmatter block.
-    The date is set to the current date in yyyy-mm-dd format.
+    The date is set to the current date in yyyy-mm-dd format. Unlisted pages are left out of
+    the site wide page lists (home page, RSS), so generated pages do not flood them.
     """
+    escaped_title = title.replace("\\", "\\\\").replace('"', '\\"')
     frontmatter = [
         "---",
-        f'title: "{title}"',
+        f'title: "{escaped_title}"',
         f'date: {datetime.date.today().strftime("%Y-%m-%d")}',
         f'draft: {str(draft).lower()}',
-        "---\n"
     ]
+    if unlisted:
+        frontmatter += ["build:", "  list: local"]
+    frontmatter.append("---\n")
     return frontmatter
+
+
+def same_page(existing: str, page: str) -> bool:
+    """
+    Returns True when two markdown pages only differ by their frontmatter date.
+    """
+    def without_date(text: str) -> list[str]:
+        lines = text.split("\n")
+        if lines[0] != "---" or "---" not in lines[1:]:
+            return lines
+        end = lines.index("---", 1)
+        return [line for line in lines[:end] if not line.startswith("date: ")] + lines[end:]
+    return without_date(existing) == without_date(page)
@@ -0,0 +1,107 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import polars as pl
+
+
+class StageTimings:
+    """
+    Accumulates the time spent and the number of items processed per pipeline stage.
+    Worker processes fill their own instance and send a snapshot with every result,
+    the parent merges them into its own.
+    """
+
+    def __init__(self, where: str = "parent"):
+        self.where = where
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.counts[stage] = self.counts.get(stage, 0) + count
+
+    @contextmanager
+    def stage(self, stage: str, count: int = 1) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, count)
+
+    def snapshot(self, reset: bool = True) -> Dict[str, tuple]:
+        """
+        Returns the timings as a picklable {stage: (seconds, count)} dict, optionally starting over.
+        """
+        with self._lock:
+            snapshot = {stage: (self.seconds[stage], self.counts[stage]) for stage in self.seconds}
+            if reset:
+                self.seconds = {}
+                self.counts = {}
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, tuple]) -> None:
+        for stage, (seconds, count) in snapshot.items():
+            self.add(stage, seconds, count)
+
+    def rows(self) -> List[dict]:
+        return [
+            {
+                "stage": stage,
+                "where": self.where,
+                "seconds": seconds,
+                "count": self.counts[stage],
+                "us_per_item": seconds / self.counts[stage] * 1e6 if self.counts[stage] else None,
+            }
+            for stage, seconds in self.seconds.items()
+        ]
+
+
+def write_profile_report(report_path: str, timings: List[StageTimings], wall_time: float) -> None:
+    """
+    Writes the per-stage timings as JSON, or as a Parquet table when report_path ends with .parquet.
+    Worker stages are summed over all the workers, so they can exceed the wall time.
+    """
+    rows = [row for stage_timings in timings for row in stage_timings.rows()]
+    if report_path.endswith(".parquet"):
+        pl.DataFrame(rows).write_parquet(report_path)
+        return
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"wall_time": wall_time, "stages": rows}, f, indent=2)
+
+
+def print_profile(timings: List[StageTimings], wall_time: float) -> None:
+    print(f"Stage timings over {wall_time:.2f}s (worker stages are summed over all the workers):")
+    for stage_timings in timings:
+        for row in stage_timings.rows():
+            per_item = f", {row['us_per_item']:.1f}us/item" if row["us_per_item"] is not None else ""
+            print(f"  {row['where']:>6} {row['stage']:<15} {row['seconds']:8.3f}s over {row['count']} items{per_item}")
+
+
+_worker_profiler: Optional[cProfile.Profile] = None
+
+
+@contextmanager
+def worker_cprofile(profile_dir: Optional[str]) -> Iterator[None]:
+    """
+    Profiles the enclosed code with a cProfile profiler kept for the lifetime of the process,
+    and dumps the cumulated stats to profile_dir/worker-<pid>.prof. Does nothing without profile_dir.
+    """
+    global _worker_profiler
+    if not profile_dir:
+        yield
+        return
+    if _worker_profiler is None:
+        _worker_profiler = cProfile.Profile()
+    _worker_profiler.enable()
+    try:
+        yield
+    finally:
+        _worker_profiler.disable()
+        _worker_profiler.dump_stats(os.path.join(profile_dir, f"worker-{os.getpid()}.prof"))
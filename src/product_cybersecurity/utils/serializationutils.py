@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+COMPACT_SUFFIX = ".min.json"
+
+
+@lru_cache(maxsize=None)
+def schema_version(model_cls: Type[BaseModel]) -> str:
+    """
+    Returns a short hash of the model JSON schema.
+    Any change to the model fields, types or enums changes the version.
+    """
+    schema = json.dumps(model_cls.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+
+
+def compact_path(json_path: str) -> str:
+    """
+    Returns the path of the compact artefact written next to a readable JSON file
+    (e.g. data/cwe.json -> data/cwe.min.json).
+    """
+    root, _ = os.path.splitext(json_path)
+    return root + COMPACT_SUFFIX
+
+
+def _source_stamp(source_path: str) -> Optional[Dict[str, int]]:
+    """
+    Returns the size and modification time of the readable JSON a compact artefact was written from,
+    or None when it does not exist.
+    """
+    try:
+        stat = os.stat(source_path)
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _compact_header(model_cls: Type[BaseModel], source_path: str) -> bytes:
+    header = {"model": model_cls.__name__, "schema_version": schema_version(model_cls), "source": _source_stamp(source_path)}
+    return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+
+def save_compact(model: BaseModel, file_path: str, source_path: str) -> None:
+    """
+    Writes the model as minified JSON preceded by a one line header holding the schema version and
+    the size and mtime of source_path, the readable JSON just written for the same model.
+    Minified JSON never contains a raw newline, so the header can be split off cheaply.
+    """
+    with open(file_path, "wb") as f:
+        f.write(_compact_header(type(model), source_path))
+        f.write(b"\n")
+        f.write(model.model_dump_json().encode("utf-8"))
+
+
+def load_compact(model_cls: Type[ModelT], file_path: str, source_path: str) -> Optional[ModelT]:
+    """
+    Loads a compact artefact written by save_compact.
+    Returns None when the file is missing, its header does not match the current schema or
+    source_path was modified since, so callers can fall back to the readable JSON.
+    """
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "rb") as f:
+        header = f.readline().rstrip(b"\n")
+        if header != _compact_header(model_cls, source_path):
+            return None
+        payload = f.read()
+    return model_cls.model_validate_json(payload)
+
+
+def load_collection(model_cls: Type[ModelT], json_path: str) -> ModelT:
+    """
+    Loads a collection, preferring the compact artefact next to json_path when it is
+    up to date with both the schema and json_path, and falling back to the readable JSON otherwise.
+    """
+    model = load_compact(model_cls, compact_path(json_path), json_path)
+    if model is not None:
+        return model
+    with open(json_path, "rb") as f:
+        return model_cls.model_validate_json(f.read())
+
+
+def is_unchanged(file_path: str, data: bytes) -> bool:
+    """
+    Returns True when file_path exists and already holds data, compared by SHA-256 content hash.
+    """
+    try:
+        if os.path.getsize(file_path) != len(data):
+            return False
+        with open(file_path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").digest() == hashlib.sha256(data).digest()
+    except FileNotFoundError:
+        return False
+
+
+# Suffix of the gzip precompressed copies write_precompressed writes
+PRECOMPRESSED_SUFFIX = ".gz"
+
+# Suffixes of the precompressed copies earlier builds may have left next to a file
+STALE_PRECOMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def write_precompressed(file_path: str, data: bytes) -> Dict[str, int]:
+    """
+    Writes data to file_path along with a gzip compressed file_path.gz, which the visualiser fetches
+    and decompresses itself, as GitHub Pages does not serve precompressed siblings.
+    Returns the size of every file written, keyed by its suffix ("" for file_path itself).
+    """
+    # mtime=0 keeps the .gz files byte identical from one build to the next
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(file_path, "wb") as f:
+        f.write(data)
+    with open(file_path + PRECOMPRESSED_SUFFIX, "wb") as f:
+        f.write(compressed)
+    return {"": len(data), PRECOMPRESSED_SUFFIX: len(compressed)}
+
+
+def remove_precompressed(file_path: str, keep: Tuple[str, ...] = ()) -> bool:
+    """
+    Removes the precompressed copies of file_path but those with a suffix in keep, so that stale
+    ones do not shadow it. Returns True when any was removed.
+    """
+    removed = False
+    for suffix in STALE_PRECOMPRESSED_SUFFIXES:
+        if suffix in keep:
+            continue
+        try:
+            os.remove(file_path + suffix)
+            removed = True
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def remove_output(file_path: str) -> bool:
+    """
+    Removes a file that builds with the current options no longer write, along with its precompressed
+    copies. Returns True when any was removed.
+    """
+    removed = remove_precompressed(file_path)
+    try:
+        os.remove(file_path)
+        return True
+    except FileNotFoundError:
+        return removed
@@ -3,13 +3,12 @@ document.addEventListener('DOMContentLoaded', (event) => {
 
     showLoadingIndicator();
 
-    // Graph JSONs are generated into `www/static/gen/graphs`, which Hugo publishes at `/gen/graphs`.
-    // Use a path relative to site root so it works locally and on GitHub Pages project subpath.
-    const jsonFilename = "gen/graphs/" + getJsonFilenameFromUrl();
-    fetch(jsonFilename)
-        .then(response => response.json())
+    const jsonFilename = graphDirectory + getJsonFilenameFromUrl();
+    loadGraph(jsonFilename)
         .then(data => {
             hideLoadingIndicator();
+            currentData = data;
+            tagLevelOfDetail(data);
             const urlParameters = getUrlParameters(); // Get URL parameters
             createAbstractionCheckboxes(data, urlParameters); // Pass URL parameters
             globalNodeSelection = createChart(data); // Store the initial node selection
@@ -25,12 +24,77 @@ document.addEventListener('DOMContentLoaded', (event) => {
     window.addEventListener('resize', handleWindowResize); // Attach resize event
 });
 
+// Graph JSONs are generated into `www/static/gen/graphs`, which Hugo publishes at `/gen/graphs`.
+// Use a path relative to site root so it works locally and on GitHub Pages project subpath.
+const graphDirectory = "gen/graphs/";
+
+// Graph files may be published with a gzip precompressed sibling (graph.py --precompress), which
+// gen/graphs/graph-files.js, written by every build, announces in graphFiles.precompressed.
+// When the browser can decompress it, fetch that one so the transfer stays small even where
+// the server does not compress JSON; fall back to the plain file otherwise.
+const precompressedGraphs = typeof graphFiles !== 'undefined' && graphFiles.precompressed;
+
+function fetchGraphJson(path) {
+    const fetchPlain = () => fetch(path).then(response => response.json());
+    if (!precompressedGraphs || !('DecompressionStream' in window)) {
+        return fetchPlain();
+    }
+    return fetch(path + '.gz')
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return new Response(response.body.pipeThrough(new DecompressionStream('gzip'))).json();
+        })
+        .catch(fetchPlain);
+}
+
+// Node catalogues shared by the graph files of a page, fetched once
+const catalogues = new Map();
+
+function fetchCatalogue(path) {
+    if (!catalogues.has(path)) {
+        catalogues.set(path, fetchGraphJson(path));
+    }
+    return catalogues.get(path);
+}
+
+// Loads a graph file as node-link data. Files written with graph.py --shared-nodes only hold
+// node ids and [source, target] links: the node attributes are joined from their catalogue,
+// along with the attributes specific to the file.
+function loadGraph(path) {
+    return fetchGraphJson(path).then(data => {
+        if (!data.catalogue) {
+            return data;
+        }
+        const directory = path.substring(0, path.lastIndexOf('/') + 1);
+        return fetchCatalogue(directory + data.catalogue).then(catalogue => ({
+            graph: data.graph,
+            nodes: data.nodes.map((id, i) => {
+                const node = { id, ...catalogue.nodes[id], ...(data.attributes && data.attributes[id]) };
+                if (data.positions) {
+                    [node.x, node.y] = data.positions[i];
+                }
+                return node;
+            }),
+            links: data.links.map(([source, target]) => ({ source, target }))
+        }));
+    });
+}
+
 // Configuration and constants
 const CONFIG = {
     minLinkDistance: 100,
     repulsionStrength: -400,
     alphaDecay: 0.01,
-    velocityDecay: 0.2
+    velocityDecay: 0.2,
+    // Graphs laid out offline (graph.py --layout) only get a short refinement from this alpha
+    refinementAlpha: 0.05,
+    refinementAlphaDecay: 0.05,
+    // Alpha the simulation is reheated to when a collapsed node is expanded
+    expandAlpha: 0.3,
+    // Delay before a click expands a node, a second click within it makes a double click instead
+    doubleClickDelay: 250
 };
 
 function addEventListeners() {
@@ -85,6 +149,7 @@ function toggleDrawer() {
 let showArrows = false;
 let link, node, labels, simulation; // Declare variables globally
 let globalNodeSelection;
+let currentData; // Graph shown, grows as level of detail nodes get expanded
 let zoom; // Declare zoom globally so it can be used in multiple functions
 
 function createChart(data) {
@@ -119,7 +184,8 @@ function createSVG(width, height) {
 }
 
 function setupSimulation(nodes, links) {
-    const { minLinkDistance, repulsionStrength, alphaDecay, velocityDecay } = CONFIG;
+    const { minLinkDistance, repulsionStrength, alphaDecay, velocityDecay, refinementAlpha, refinementAlphaDecay } = CONFIG;
+    const laidOut = nodes.length > 0 && nodes.every(d => d.x !== undefined && d.y !== undefined);
 
     simulation = d3.forceSimulation(nodes)
         .force("link", d3.forceLink(links).id(d => d.id).distance(minLinkDistance))
@@ -127,7 +193,8 @@ function setupSimulation(nodes, links) {
         .force("center", d3.forceCenter(0, 0))
         .force("x", d3.forceX()) 
         .force("y", d3.forceY())
-        .alphaDecay(alphaDecay)
+        .alpha(laidOut ? refinementAlpha : 1)
+        .alphaDecay(laidOut ? refinementAlphaDecay : alphaDecay)
         .velocityDecay(velocityDecay)
         .on("tick", ticked);
 
@@ -199,6 +266,8 @@ function createLinks(g, links) {
         .attr("marker-end", showArrows ? "url(#arrowhead)" : "");
 }
 
+let expandTimer = null;
+
 function createNodes(g, nodes) {
     return g.append("g")
         .attr("stroke", "#000000")
@@ -208,9 +277,18 @@ function createNodes(g, nodes) {
         .join("circle")
         .attr("r", d => d.size)
         .attr("fill", d => d.color)
+        .attr("stroke-dasharray", d => d.collapsed && !d.expanded ? "3,2" : null)
         .on("mouseover", showTooltip)
         .on("mouseout", hideTooltip)
+        .on("click", (event, d) => {
+            // The clicks of a double click open the node page rather than expand it
+            clearTimeout(expandTimer);
+            if (!event.defaultPrevented && event.detail === 1) {
+                expandTimer = setTimeout(() => expandNode(d), CONFIG.doubleClickDelay);
+            }
+        })
         .on("dblclick", function (event, d) {
+            clearTimeout(expandTimer);
             event.stopPropagation();
             openNodeUrl(event, d);
         })
@@ -241,7 +319,14 @@ function showTooltip(event, d) {
     const tooltip = d3.select("body").append("div")
         .attr("class", "tooltip");
 
-    tooltip.html(d.Description)
+    let html = d.Description;
+    if (d.collapsed && !d.expanded) {
+        const abstractions = Object.entries(d.collapsed_abstractions || {})
+            .map(([abstraction, count]) => count + ' ' + abstraction)
+            .join(', ');
+        html += `<br><i>${d.collapsed} collapsed descendants (${abstractions}), click to expand</i>`;
+    }
+    tooltip.html(html)
         .style("left", (event.pageX + 10) + "px")
         .style("top", (event.pageY - 28) + "px");
 }
@@ -273,6 +358,112 @@ function dragended(event) {
     event.subject.fy = null;
 }
 
+// Level of detail graphs (graph.py, CWE-LOD0.json, ...) name the file of their next level, and
+// their nodes the number of descendants collapsed into them. Expanding a node loads the next level
+// and adds the nodes it expands to, so the graph only grows where the user looks.
+const levelsOfDetail = new Map();
+// Targets of the links of every source node, per level loaded
+const levelLinks = new Map();
+
+function tagLevelOfDetail(data) {
+    const next = data.graph && data.graph.lod_next;
+    data.nodes.forEach(node => { node.lod_next = next; });
+    const bySource = new Map();
+    data.links.forEach(link => {
+        const source = link.source.id || link.source;
+        const target = link.target.id || link.target;
+        if (!bySource.has(source)) {
+            bySource.set(source, []);
+        }
+        bySource.get(source).push(target);
+    });
+    levelLinks.set((data.graph && data.graph.lod_level) || 0, bySource);
+}
+
+// Returns the links between the shown nodes. A level links every node to its nearest ancestors
+// shown at that level, so the links of a node are taken from the finest level whose targets are
+// all shown: a coarser shortcut is dropped once the nodes it skips are shown.
+function shownLevelLinks(shown) {
+    const levels = Array.from(levelLinks.keys()).sort((a, b) => b - a);
+    const links = [];
+    shown.forEach((_, source) => {
+        const levelTargets = levels.map(level => levelLinks.get(level).get(source)).filter(targets => targets);
+        if (levelTargets.length === 0) {
+            return;
+        }
+        const targets = levelTargets.find(targets => targets.every(target => shown.has(target)))
+            || levelTargets[0].filter(target => shown.has(target));
+        targets.forEach(target => links.push({ source, target }));
+    });
+    return links;
+}
+
+function loadLevelOfDetail(path) {
+    if (!levelsOfDetail.has(path)) {
+        levelsOfDetail.set(path, loadGraph(path).then(data => {
+            tagLevelOfDetail(data);
+            return data;
+        }));
+    }
+    return levelsOfDetail.get(path);
+}
+
+function expandNode(d) {
+    const expanded = currentData.nodes.find(n => n.id === d.id);
+    if (!expanded || !expanded.collapsed || expanded.expanded || !expanded.lod_next) {
+        return;
+    }
+    expanded.expanded = true;
+    loadLevelOfDetail(graphDirectory + expanded.lod_next)
+        .then(level => {
+            // Keep the positions the simulation reached
+            const shown = new Map(currentData.nodes.map(n => [n.id, n]));
+            simulation.nodes().forEach(n => {
+                const original = shown.get(n.id);
+                if (original) {
+                    original.x = n.x;
+                    original.y = n.y;
+                }
+            });
+
+            level.nodes.forEach(n => {
+                if (n.id === expanded.id) {
+                    // The node itself, with what is still collapsed at the next level
+                    delete expanded.collapsed;
+                    delete expanded.collapsed_abstractions;
+                    Object.assign(expanded, n, { x: expanded.x, y: expanded.y, expanded: false });
+                } else if (!shown.has(n.id) && (n.expands_from || []).includes(expanded.id)) {
+                    const angle = Math.random() * 2 * Math.PI;
+                    const added = { ...n, x: expanded.x + 30 * Math.cos(angle), y: expanded.y + 30 * Math.sin(angle) };
+                    shown.set(n.id, added);
+                    currentData.nodes.push(added);
+                }
+            });
+
+            currentData.links = shownLevelLinks(shown);
+
+            // New abstractions get checked checkboxes, the others keep their state
+            const checkboxes = Array.from(document.querySelectorAll('.checkbox-container input[type="checkbox"]'));
+            const known = new Set(checkboxes.map(checkbox => checkbox.id));
+            const filters = checkboxes.filter(checkbox => checkbox.checked)
+                .map(checkbox => checkbox.id.replace('checkbox-', '').split('-'));
+            currentData.nodes.forEach(n => {
+                if (!known.has('checkbox-' + n.type + '-' + n.abstraction)) {
+                    known.add('checkbox-' + n.type + '-' + n.abstraction);
+                    filters.push([n.type, n.abstraction]);
+                }
+            });
+            createAbstractionCheckboxes(currentData, filters);
+            updateGraph(currentData);
+            simulation.alpha(CONFIG.expandAlpha).alphaDecay(CONFIG.alphaDecay).restart();
+        })
+        .catch(error => {
+            expanded.expanded = false;
+            showError('Error loading data: ' + error.message);
+            console.error('Error loading data:', error);
+        });
+}
+
 // Define toggleArrows globally
 function toggleArrows() {
     showArrows = !showArrows;